@@ -46,37 +46,40 @@ class TipoGasto(Enum):
     @classmethod
     def obtener_nombre(cls, codigo: str) -> str:
         """Obtiene el nombre legible del tipo de gasto."""
-        mapeo = {
-            cls.COMBUSTIBLES.value: "Combustibles",
-            cls.REPUESTOS.value: "Repuestos y accesorios",
-            cls.REPARACIONES.value: "Reparaciones y mantención",
-            cls.EPP.value: "EPP (Protección personal)",
-            cls.SEGUROS.value: "Seguros",
-            cls.PERMISOS.value: "Permisos de circulación",
-            cls.REVISION.value: "Revisión técnica",
-            cls.HONORARIOS.value: "Honorarios",
-            cls.PEAJES.value: "Peajes y transbordador",
-            cls.ALIMENTACION.value: "Alimentación",
-            cls.PASAJES.value: "Pasajes nacionales",
-            cls.MULTAS.value: "Multas",
-            cls.OTROS_GASTOS.value: "Otros gastos",
-            cls.REMUNERACIONES.value: "Remuneraciones",
-            cls.CORRESPONDENCIA.value: "Correspondencia",
-            cls.GASTOS_LEGALES.value: "Gastos legales",
-            cls.SERVICIO_TRANSPORTE.value: "Servicio transporte",
-            cls.REVISION_TECNICA.value: "Revisión técnica",
-            cls.VARIOS.value: "Varios",
-            cls.MANTENCION_VARIOS.value: "Mantención varios",
-            cls.OTRO_GASTO_TALLER.value: "Otro gasto taller",
-            cls.ALQUILER_MAQUINARIA.value: "Alquiler maquinaria",
-            cls.SERVICIOS_EXTERNOS.value: "Servicios externos",
-            cls.ELECTRICIDAD.value: "Electricidad",
-            cls.AGUA.value: "Agua",
-            cls.OTRO_GASTO_OPERACIONAL.value: "Otro gasto operacional",
-            cls.SUMINISTROS.value: "Suministros",
-            cls.OTROS_SUMINISTROS.value: "Otros suministros",
-        }
-        return mapeo.get(codigo, f"Tipo {codigo}")
+        return _NOMBRES_TIPO_GASTO.get(codigo, f"Tipo {codigo}")
+
+
+# Nombre legible por código de cuenta; los .value se resuelven una sola vez al importar
+_NOMBRES_TIPO_GASTO = {
+    TipoGasto.COMBUSTIBLES.value: "Combustibles",
+    TipoGasto.REPUESTOS.value: "Repuestos y accesorios",
+    TipoGasto.REPARACIONES.value: "Reparaciones y mantención",
+    TipoGasto.EPP.value: "EPP (Protección personal)",
+    TipoGasto.SEGUROS.value: "Seguros",
+    TipoGasto.PERMISOS.value: "Permisos de circulación",
+    TipoGasto.REVISION.value: "Revisión técnica",
+    TipoGasto.HONORARIOS.value: "Honorarios",
+    TipoGasto.PEAJES.value: "Peajes y transbordador",
+    TipoGasto.ALIMENTACION.value: "Alimentación",
+    TipoGasto.PASAJES.value: "Pasajes nacionales",
+    TipoGasto.MULTAS.value: "Multas",
+    TipoGasto.OTROS_GASTOS.value: "Otros gastos",
+    TipoGasto.REMUNERACIONES.value: "Remuneraciones",
+    TipoGasto.CORRESPONDENCIA.value: "Correspondencia",
+    TipoGasto.GASTOS_LEGALES.value: "Gastos legales",
+    TipoGasto.SERVICIO_TRANSPORTE.value: "Servicio transporte",
+    TipoGasto.REVISION_TECNICA.value: "Revisión técnica",
+    TipoGasto.VARIOS.value: "Varios",
+    TipoGasto.MANTENCION_VARIOS.value: "Mantención varios",
+    TipoGasto.OTRO_GASTO_TALLER.value: "Otro gasto taller",
+    TipoGasto.ALQUILER_MAQUINARIA.value: "Alquiler maquinaria",
+    TipoGasto.SERVICIOS_EXTERNOS.value: "Servicios externos",
+    TipoGasto.ELECTRICIDAD.value: "Electricidad",
+    TipoGasto.AGUA.value: "Agua",
+    TipoGasto.OTRO_GASTO_OPERACIONAL.value: "Otro gasto operacional",
+    TipoGasto.SUMINISTROS.value: "Suministros",
+    TipoGasto.OTROS_SUMINISTROS.value: "Otros suministros",
+}
 
 
 class GastoOperacional:
@@ -93,6 +96,11 @@ class GastoOperacional:
         - origen: Archivo de origen
     """
     
+    # Sin __dict__ por instancia: se crean miles de gastos por informe
+    __slots__ = (
+        'codigo_maquina', 'fecha', 'tipo_gasto', 'glosa', 'monto', 'es_ingreso', 'origen'
+    )
+    
     def __init__(
         self,
         codigo_maquina: str,
@@ -29,6 +29,36 @@ class CalculadorGastos:
     
     COSTO_HORA_FIJO = Decimal('35000')  # $35.000 CLP por hora
     
+    # Campo del desglose según el código de tipo de gasto (valores resueltos una
+    # sola vez al definir la clase, en lugar de comparar contra cada .value por gasto)
+    CAMPO_POR_TIPO = {
+        TipoGasto.COMBUSTIBLES.value: 'combustibles',
+        TipoGasto.REPARACIONES.value: 'reparaciones',
+        TipoGasto.SEGUROS.value: 'seguros',
+        TipoGasto.HONORARIOS.value: 'honorarios',
+        TipoGasto.EPP.value: 'epp',
+        TipoGasto.PEAJES.value: 'peajes',
+        TipoGasto.REMUNERACIONES.value: 'remuneraciones',
+        TipoGasto.PERMISOS.value: 'permisos',
+        TipoGasto.ALIMENTACION.value: 'alimentacion',
+        TipoGasto.PASAJES.value: 'pasajes',
+        TipoGasto.CORRESPONDENCIA.value: 'correspondencia',
+        TipoGasto.GASTOS_LEGALES.value: 'gastos_legales',
+        TipoGasto.MULTAS.value: 'multas',
+        TipoGasto.OTROS_GASTOS.value: 'otros_gastos',
+        TipoGasto.REVISION_TECNICA.value: 'otros_gastos',
+        TipoGasto.VARIOS.value: 'otros_gastos',
+        TipoGasto.MANTENCION_VARIOS.value: 'reparaciones',
+        TipoGasto.OTRO_GASTO_TALLER.value: 'otros_gastos',
+        TipoGasto.ALQUILER_MAQUINARIA.value: 'otros_gastos',
+        TipoGasto.SERVICIOS_EXTERNOS.value: 'otros_gastos',
+        TipoGasto.ELECTRICIDAD.value: 'otros_gastos',
+        TipoGasto.AGUA.value: 'otros_gastos',
+        TipoGasto.OTRO_GASTO_OPERACIONAL.value: 'otros_gastos',
+        TipoGasto.SUMINISTROS.value: 'otros_gastos',
+        TipoGasto.OTROS_SUMINISTROS.value: 'otros_gastos'
+    }
+    
     @classmethod
     def calcular_por_maquina_mes(
         cls,
@@ -182,61 +212,14 @@ class CalculadorGastos:
             
             clave = (gasto.codigo_maquina, gasto.mes)
             
-            # Clasificar por tipo de gasto
-            if gasto.tipo_gasto == TipoGasto.COMBUSTIBLES.value:
-                resultado[clave]['combustibles'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.REPARACIONES.value:
-                resultado[clave]['reparaciones'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.SEGUROS.value:
-                resultado[clave]['seguros'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.HONORARIOS.value:
-                resultado[clave]['honorarios'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.EPP.value:
-                resultado[clave]['epp'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.PEAJES.value:
-                resultado[clave]['peajes'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.REMUNERACIONES.value:
-                resultado[clave]['remuneraciones'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.PERMISOS.value:
-                resultado[clave]['permisos'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.ALIMENTACION.value:
-                resultado[clave]['alimentacion'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.PASAJES.value:
-                resultado[clave]['pasajes'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.CORRESPONDENCIA.value:
-                resultado[clave]['correspondencia'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.GASTOS_LEGALES.value:
-                resultado[clave]['gastos_legales'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.MULTAS.value:
-                resultado[clave]['multas'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.OTROS_GASTOS.value:
-                resultado[clave]['otros_gastos'] += gasto.monto
-            # Agregar nuevos tipos de gasto
-            elif gasto.tipo_gasto == TipoGasto.REVISION_TECNICA.value:
-                resultado[clave]['otros_gastos'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.VARIOS.value:
-                resultado[clave]['otros_gastos'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.MANTENCION_VARIOS.value:
-                resultado[clave]['reparaciones'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.OTRO_GASTO_TALLER.value:
-                resultado[clave]['otros_gastos'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.ALQUILER_MAQUINARIA.value:
-                resultado[clave]['otros_gastos'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.SERVICIOS_EXTERNOS.value:
-                resultado[clave]['otros_gastos'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.ELECTRICIDAD.value:
-                resultado[clave]['otros_gastos'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.AGUA.value:
-                resultado[clave]['otros_gastos'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.OTRO_GASTO_OPERACIONAL.value:
-                resultado[clave]['otros_gastos'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.SUMINISTROS.value:
-                resultado[clave]['otros_gastos'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.OTROS_SUMINISTROS.value:
-                resultado[clave]['otros_gastos'] += gasto.monto
-            elif gasto.tipo_gasto.startswith('401'):
-                # Cualquier código 401 que no esté mapeado se clasifica como "otros_gastos"
-                resultado[clave]['otros_gastos'] += gasto.monto
+            # Clasificar por tipo de gasto; cualquier código 401 que no esté
+            # mapeado se clasifica como "otros_gastos" y el resto se ignora
+            campo = cls.CAMPO_POR_TIPO.get(gasto.tipo_gasto)
+            if campo is None:
+                if not gasto.tipo_gasto.startswith('401'):
+                    continue
+                campo = 'otros_gastos'
+            resultado[clave][campo] += gasto.monto
         
         # Calcular totales
         for clave in resultado:
@@ -7,6 +7,7 @@ Sigue el principio de responsabilidad única (SRP).
 
 from decimal import Decimal
 from typing import Dict, Tuple
+from itertools import chain
 
 from src.domain.services.CalculadorProduccion import CalculadorProduccion
 from src.domain.services.CalculadorGastos import CalculadorGastos
@@ -17,6 +18,24 @@ from src.domain.entities.Leasing import Leasing
 from src.domain.entities.GastoOperacional import GastoOperacional
 
 
+_ZERO = Decimal('0')
+
+# Claves de los valores por defecto para máquinas/meses sin producción o sin
+# gastos. Los diccionarios se crean con dict.fromkeys solo cuando falta la clave,
+# en vez de armar un literal en cada iteración como argumento de .get()
+_CLAVES_PRODUCCION = ('mt3', 'horas_trabajadas', 'kilometros', 'vueltas', 'valor_monetario')
+_CLAVES_GASTOS = ('repuestos', 'horas_hombre', 'costo_hh', 'leasing', 'total')
+_CLAVES_GASTOS_COMPLETOS = (
+    'repuestos', 'horas_hombre', 'costo_hh', 'leasing', 'combustibles',
+    'reparaciones', 'seguros', 'honorarios', 'epp', 'peajes',
+    'remuneraciones', 'permisos', 'alimentacion', 'pasajes',
+    'correspondencia', 'gastos_legales', 'multas', 'otros_gastos',
+    'total_gastos_operacionales', 'total'
+)
+# Unidades de producción real (solo se informa el valor monetario)
+_UNIDADES_CERO = dict.fromkeys(('mt3', 'horas_trabajadas', 'kilometros', 'vueltas'), _ZERO)
+
+
 class CalculadorProduccionReal:
     """
     Calcula la producción real restando los gastos de la producción.
@@ -71,28 +90,20 @@ class CalculadorProduccionReal:
         resultado = {}
         
         # Procesar todas las máquinas y meses que tienen producción
-        todas_las_claves = set(prod_por_mes.keys()) | set(gastos_por_mes.keys())
+        todas_las_claves = dict.fromkeys(chain(prod_por_mes, gastos_por_mes))
         
         for clave in todas_las_claves:
-            prod = prod_por_mes.get(clave, {
-                'mt3': Decimal('0'),
-                'horas_trabajadas': Decimal('0'),
-                'kilometros': Decimal('0'),
-                'vueltas': Decimal('0'),
-                'valor_monetario': Decimal('0')
-            })
+            prod = prod_por_mes.get(clave)
+            if prod is None:
+                prod = dict.fromkeys(_CLAVES_PRODUCCION, _ZERO)
             
-            gastos = gastos_por_mes.get(clave, {
-                'repuestos': Decimal('0'),
-                'horas_hombre': Decimal('0'),
-                'costo_hh': Decimal('0'),
-                'leasing': Decimal('0'),
-                'total': Decimal('0')
-            })
+            gastos = gastos_por_mes.get(clave)
+            if gastos is None:
+                gastos = dict.fromkeys(_CLAVES_GASTOS, _ZERO)
             
             # Calcular producción neta usando el valor monetario real del CSV
             # Este valor ya viene calculado como: unidades × precio_unidad (del CSV)
-            produccion_neta = prod.get('valor_monetario', Decimal('0'))
+            produccion_neta = prod.get('valor_monetario', _ZERO)
             
             # Calcular producción real (producción neta - gastos totales)
             produccion_real = produccion_neta - gastos['total']
@@ -107,13 +118,10 @@ class CalculadorProduccionReal:
                     'vueltas': prod['vueltas'],
                     'valor_monetario': produccion_neta
                 },
-                'produccion_real': {
-                    'mt3': Decimal('0'),
-                    'horas_trabajadas': Decimal('0'),
-                    'kilometros': Decimal('0'),
-                    'vueltas': Decimal('0'),
-                    'valor_monetario': produccion_real  # Producción Neta - Gastos Totales
-                }
+                'produccion_real': dict(
+                    _UNIDADES_CERO,
+                    valor_monetario=produccion_real  # Producción Neta - Gastos Totales
+                )
             }
         
         return resultado
@@ -161,28 +169,21 @@ class CalculadorProduccionReal:
         resultado = {}
         
         # Procesar todas las máquinas y meses que tienen producción o gastos
-        todas_las_claves = set(prod_por_mes.keys()) | set(gastos_por_mes.keys())
+        todas_las_claves = dict.fromkeys(chain(prod_por_mes, gastos_por_mes))
         
         for clave in todas_las_claves:
-            prod = prod_por_mes.get(clave, {
-                'mt3': Decimal('0'),
-                'horas_trabajadas': Decimal('0'),
-                'kilometros': Decimal('0'),
-                'vueltas': Decimal('0'),
-                'valor_monetario': Decimal('0')
-            })
+            prod = prod_por_mes.get(clave)
+            if prod is None:
+                prod = dict.fromkeys(_CLAVES_PRODUCCION, _ZERO)
             
-            gastos = gastos_por_mes.get(clave, {
-                'repuestos': Decimal('0'),
-                'horas_hombre': Decimal('0'),
-                'costo_hh': Decimal('0'),
-                'leasing': Decimal('0'),
-                'total_gastos_operacionales': Decimal('0'),
-                'total': Decimal('0')
-            })
+            # Mismas claves que CalculadorGastos.calcular_por_maquina_mes_completo,
+            # para que los consumidores puedan indexar sin .get()
+            gastos = gastos_por_mes.get(clave)
+            if gastos is None:
+                gastos = dict.fromkeys(_CLAVES_GASTOS_COMPLETOS, _ZERO)
             
             # Calcular producción neta usando el valor monetario real del CSV
-            produccion_neta = prod.get('valor_monetario', Decimal('0'))
+            produccion_neta = prod.get('valor_monetario', _ZERO)
             
             # Calcular producción real usando el total completo de gastos
             # El 'total' de gastos_por_mes ya incluye repuestos + HH + leasing + gastos operacionales
@@ -198,13 +199,10 @@ class CalculadorProduccionReal:
                     'vueltas': prod['vueltas'],
                     'valor_monetario': produccion_neta
                 },
-                'produccion_real': {
-                    'mt3': Decimal('0'),
-                    'horas_trabajadas': Decimal('0'),
-                    'kilometros': Decimal('0'),
-                    'vueltas': Decimal('0'),
-                    'valor_monetario': produccion_real  # Producción Neta - Gastos Totales (completos)
-                }
+                'produccion_real': dict(
+                    _UNIDADES_CERO,
+                    valor_monetario=produccion_real  # Producción Neta - Gastos Totales (completos)
+                )
             }
         
         return resultado
@@ -235,28 +233,20 @@ class CalculadorProduccionReal:
         # Combinar resultados
         resultado = {}
         
-        todas_las_maquinas = set(prod_total.keys()) | set(gastos_total.keys())
+        todas_las_maquinas = dict.fromkeys(chain(prod_total, gastos_total))
         
         for codigo in todas_las_maquinas:
-            prod = prod_total.get(codigo, {
-                'mt3': Decimal('0'),
-                'horas_trabajadas': Decimal('0'),
-                'kilometros': Decimal('0'),
-                'vueltas': Decimal('0'),
-                'valor_monetario': Decimal('0')
-            })
+            prod = prod_total.get(codigo)
+            if prod is None:
+                prod = dict.fromkeys(_CLAVES_PRODUCCION, _ZERO)
             
-            gastos = gastos_total.get(codigo, {
-                'repuestos': Decimal('0'),
-                'horas_hombre': Decimal('0'),
-                'costo_hh': Decimal('0'),
-                'leasing': Decimal('0'),
-                'total': Decimal('0')
-            })
+            gastos = gastos_total.get(codigo)
+            if gastos is None:
+                gastos = dict.fromkeys(_CLAVES_GASTOS, _ZERO)
             
             # Calcular producción neta usando el valor monetario real del CSV
             # Este valor ya viene calculado como: unidades × precio_unidad (del CSV)
-            produccion_neta = prod.get('valor_monetario', Decimal('0'))
+            produccion_neta = prod.get('valor_monetario', _ZERO)
             
             # Calcular producción real (producción neta - gastos totales)
             produccion_real = produccion_neta - gastos['total']
@@ -271,13 +261,10 @@ class CalculadorProduccionReal:
                     'vueltas': prod['vueltas'],
                     'valor_monetario': produccion_neta
                 },
-                'produccion_real': {
-                    'mt3': Decimal('0'),
-                    'horas_trabajadas': Decimal('0'),
-                    'kilometros': Decimal('0'),
-                    'vueltas': Decimal('0'),
-                    'valor_monetario': produccion_real  # Producción Neta - Gastos Totales
-                }
+                'produccion_real': dict(
+                    _UNIDADES_CERO,
+                    valor_monetario=produccion_real  # Producción Neta - Gastos Totales
+                )
             }
         
         return resultado
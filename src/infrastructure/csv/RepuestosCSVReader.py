@@ -26,6 +26,12 @@ class RepuestosCSVReader:
     MESES_FILTRO = [10, 11, 12]  # Octubre, Noviembre, Diciembre
     ANIO_FILTRO = 2025
     
+    # Fecha dd-mm-yyyy: mismos dígitos que acepta strptime con '%d-%m-%Y', pero
+    # sin su costo por llamada (es lo más caro de leer el archivo fila a fila)
+    PATRON_FECHA = re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})')
+    # Código de máquina al inicio del centro de costo (ej: CT-12)
+    PATRON_CODIGO = re.compile(r'^([A-Z]+-\d+[A-Z0-9-]*)')
+    
     def __init__(self, ruta_archivo: str):
         """
         Inicializa el lector con la ruta del archivo.
@@ -48,8 +54,15 @@ class RepuestosCSVReader:
             Objeto datetime o None si no se puede parsear
         """
         try:
-            return datetime.strptime(fecha_str.strip(), '%d-%m-%Y')
-        except (ValueError, AttributeError):
+            match = self.PATRON_FECHA.fullmatch(fecha_str.strip())
+        except AttributeError:
+            return None
+        if not match:
+            return None
+        dia, mes, anio = match.groups()
+        try:
+            return datetime(int(anio), int(mes), int(dia))
+        except ValueError:
             return None
     
     def _parsear_precio(self, precio_str: str) -> Decimal:
@@ -116,8 +129,7 @@ class RepuestosCSVReader:
             return codigo
         
         # Si no funciona, buscar patrón al inicio
-        patron = re.compile(r'^([A-Z]+-\d+[A-Z0-9-]*)')
-        match = patron.match(centro_costo.strip())
+        match = self.PATRON_CODIGO.match(centro_costo.strip())
         if match:
             return match.group(1)
         
@@ -7,8 +7,11 @@ Sigue el principio de responsabilidad única (SRP).
 
 from decimal import Decimal
 from pathlib import Path
-from typing import Dict, Tuple, List, Optional
-import json
+from typing import Dict, Tuple, List, Optional, Iterable, Iterator
+from string import Template
+from collections import defaultdict
+from operator import itemgetter
+import sys
 
 from src.domain.entities.Produccion import Produccion
 from src.domain.entities.HorasHombre import HorasHombre
@@ -17,440 +20,62 @@ from src.domain.entities.Leasing import Leasing
 from src.domain.entities.GastoOperacional import GastoOperacional
 from src.domain.services.CalculadorProduccionReal import CalculadorProduccionReal
 from src.domain.services.CalculadorGastos import CalculadorGastos
+from src.infrastructure.export.formato import formatear_moneda, formatear_numero
+from src.infrastructure.export.salida import escribir_partes
 
 
-class HTMLExporter:
-    """
-    Exporta los datos del informe a un archivo HTML.
-    
-    Crea un dashboard interactivo con:
-    - Resumen ejecutivo
-    - Gráficos de producción vs gastos
-    - Tablas con datos ya incluidos (estático)
-    - Tabs y sub-tabs para navegación
-    - Detalle por máquina
-    """
-    
-    MESES = {
-        10: 'Octubre',
-        11: 'Noviembre',
-        12: 'Diciembre'
-    }
-    
-    def __init__(self, ruta_salida: str):
-        """
-        Inicializa el exportador.
-        
-        Args:
-            ruta_salida: Ruta donde se guardará el archivo HTML
-        """
-        self.ruta_salida = Path(ruta_salida)
-    
-    def _formatear_moneda(self, valor: Decimal) -> str:
-        """Formatea un valor como moneda chilena."""
-        return f"${valor:,.0f}".replace(',', '.')
-    
-    def _formatear_numero(self, valor: Decimal, decimales: int = 2) -> str:
-        """Formatea un número con decimales."""
-        return f"{valor:,.{decimales}f}".replace(',', '.')
-    
-    def _get_total_gastos(self, gastos: Dict, incluir_gastos_operacionales: bool = False) -> Decimal:
-        """
-        Obtiene el total de gastos de manera segura.
-        
-        Args:
-            gastos: Diccionario de gastos
-            incluir_gastos_operacionales: Si True, el total ya incluye gastos operacionales
-            
-        Returns:
-            Total de gastos (siempre incluye todos los gastos cuando hay operacionales)
-        """
-        # El 'total' siempre debe estar presente cuando hay gastos operacionales
-        # Si no está, intentamos calcularlo o retornamos 0
-        if 'total' in gastos:
-            return gastos['total']
-        elif incluir_gastos_operacionales and 'total_gastos_operacionales' in gastos:
-            # Si no hay 'total' pero hay gastos operacionales, calcularlo
-            return (gastos.get('repuestos', Decimal('0')) +
-                   gastos.get('costo_hh', Decimal('0')) +
-                   gastos.get('leasing', Decimal('0')) +
-                   gastos.get('total_gastos_operacionales', Decimal('0')))
-        else:
-            # Caso básico: solo repuestos + HH + leasing
-            return (gastos.get('repuestos', Decimal('0')) +
-                   gastos.get('costo_hh', Decimal('0')) +
-                   gastos.get('leasing', Decimal('0')))
-    
-    def exportar(
-        self,
-        producciones: List[Produccion],
-        repuestos: List[Repuesto],
-        horas_hombre: List[HorasHombre],
-        leasing: Optional[List[Leasing]] = None
-    ):
-        """
-        Exporta todos los datos a HTML.
-        
-        Args:
-            producciones: Lista de producciones
-            repuestos: Lista de repuestos
-            horas_hombre: Lista de horas hombre
-            leasing: Lista de leasing (opcional)
-        """
-        # Calcular datos agregados
-        datos = CalculadorProduccionReal.calcular_por_maquina_mes(
-            producciones, repuestos, horas_hombre, leasing or []
-        )
-        
-        # Generar HTML
-        html = self._generar_html(datos, producciones, repuestos, horas_hombre)
-        
-        # Guardar archivo
-        with open(self.ruta_salida, 'w', encoding='utf-8') as f:
-            f.write(html)
-    
-    def exportar_completo(
-        self,
-        producciones: List[Produccion],
-        repuestos: List[Repuesto],
-        horas_hombre: List[HorasHombre],
-        gastos_operacionales: List[GastoOperacional],
-        leasing: Optional[List[Leasing]] = None
-    ):
-        """
-        Exporta todos los datos completos a HTML (producción + gastos operacionales).
-        
-        Args:
-            producciones: Lista de producciones
-            repuestos: Lista de repuestos
-            horas_hombre: Lista de horas hombre
-            gastos_operacionales: Lista de gastos de reportes contables
-            leasing: Lista de leasing (opcional)
-        """
-        # Calcular datos de producción real con gastos completos (incluyendo operacionales)
-        datos = CalculadorProduccionReal.calcular_por_maquina_mes_completo(
-            producciones, repuestos, horas_hombre, gastos_operacionales, leasing or []
-        )
-        
-        # También necesitamos los datos de gastos completos para el HTML
-        datos_gastos = CalculadorGastos.calcular_por_maquina_mes_completo(
-            repuestos, horas_hombre, gastos_operacionales, leasing or []
-        )
-        
-        # Actualizar los gastos en los datos combinados para asegurar consistencia
-        for clave in datos.keys():
-            if clave in datos_gastos:
-                # Asegurarse de que 'gastos' es un diccionario, no un Decimal
-                if isinstance(datos_gastos[clave], dict):
-                    datos[clave]['gastos'] = datos_gastos[clave]
-        
-        # Generar HTML
-        html = self._generar_html_completo(datos, producciones, repuestos, horas_hombre, gastos_operacionales)
-        
-        # Guardar archivo
-        with open(self.ruta_salida, 'w', encoding='utf-8') as f:
-            f.write(html)
-    
-    def _combinar_datos_produccion_gastos(
-        self, 
-        datos_produccion: Dict[Tuple[str, int], Dict], 
-        datos_gastos: Dict[Tuple[str, int], Dict]
-    ) -> Dict[Tuple[str, int], Dict]:
-        """Combina datos de producción y gastos en una sola estructura."""
-        datos_combinados: Dict[Tuple[str, int], Dict] = {}
-        
-        # Obtener todas las claves únicas
-        todas_claves = set(datos_produccion.keys()) | set(datos_gastos.keys())
-        
-        for clave in todas_claves:
-            datos_combinados[clave] = {}
-            
-            # Agregar datos de producción si existen
-            if clave in datos_produccion:
-                datos_combinados[clave]['produccion'] = datos_produccion[clave]['produccion']
-                datos_combinados[clave]['produccion_neta'] = datos_produccion[clave]['produccion_neta']
-                datos_combinados[clave]['produccion_real'] = datos_produccion[clave]['produccion_real']
-            else:
-                # Valores por defecto si no hay datos de producción
-                datos_combinados[clave]['produccion'] = {
-                    'mt3': Decimal('0'),
-                    'horas_trabajadas': Decimal('0'),
-                    'kilometros': Decimal('0'),
-                    'vueltas': Decimal('0'),
-                    'valor_mt3': Decimal('0'),
-                    'valor_horas': Decimal('0'),
-                    'valor_km': Decimal('0'),
-                    'valor_dias': Decimal('0'),
-                    'valor_vueltas': Decimal('0')
-                }
-                datos_combinados[clave]['produccion_neta'] = {
-                    'mt3': Decimal('0'),
-                    'horas_trabajadas': Decimal('0'),
-                    'kilometros': Decimal('0'),
-                    'vueltas': Decimal('0'),
-                    'valor_monetario': Decimal('0')
-                }
-                datos_combinados[clave]['produccion_real'] = {
-                    'mt3': Decimal('0'),
-                    'horas_trabajadas': Decimal('0'),
-                    'kilometros': Decimal('0'),
-                    'vueltas': Decimal('0'),
-                    'valor_monetario': Decimal('0')
-                }
-            
-            # Agregar datos de gastos si existen
-            if clave in datos_gastos:
-                datos_combinados[clave]['gastos'] = datos_gastos[clave]
-            else:
-                # Valores por defecto si no hay datos de gastos
-                datos_combinados[clave]['gastos'] = datos_gastos.get(clave, {
-                    'repuestos': Decimal('0'),
-                    'horas_hombre': Decimal('0'),
-                    'costo_hh': Decimal('0'),
-                    'leasing': Decimal('0'),
-                    'combustibles': Decimal('0'),
-                    'reparaciones': Decimal('0'),
-                    'seguros': Decimal('0'),
-                    'honorarios': Decimal('0'),
-                    'epp': Decimal('0'),
-                    'peajes': Decimal('0'),
-                    'remuneraciones': Decimal('0'),
-                    'permisos': Decimal('0'),
-                    'alimentacion': Decimal('0'),
-                    'pasajes': Decimal('0'),
-                    'correspondencia': Decimal('0'),
-                    'gastos_legales': Decimal('0'),
-                    'multas': Decimal('0'),
-                    'otros_gastos': Decimal('0'),
-                    'total_gastos_operacionales': Decimal('0'),
-                    'total': Decimal('0')
-                })
-        
-        return datos_combinados
-    
-    def _generar_html(
-        self,
-        datos: Dict[Tuple[str, int], Dict],
-        producciones: List[Produccion],
-        repuestos: List[Repuesto],
-        horas_hombre: List[HorasHombre]
-    ) -> str:
-        """Genera el contenido HTML completo estático."""
-        
-        # Calcular totales
-        total_mt3 = Decimal('0')
-        total_horas = Decimal('0')
-        total_gastos = Decimal('0')
-        total_prod_neta = Decimal('0')
-        total_prod_real = Decimal('0')
-        
-        # Datos por mes
-        datos_por_mes: Dict[int, List[Tuple[str, Dict]]] = {10: [], 11: [], 12: []}
-        datos_por_maquina: Dict[str, Dict[int, Dict]] = {}
-        
-        for (maquina, mes), valores in datos.items():
-            if maquina not in datos_por_maquina:
-                datos_por_maquina[maquina] = {}
-            datos_por_maquina[maquina][mes] = valores
-            datos_por_mes[mes].append((maquina, valores))
-            
-            total_mt3 += valores['produccion']['mt3']
-            total_horas += valores['produccion']['horas_trabajadas']
-            total_gastos += valores['gastos']['total']
-            total_prod_neta += valores['produccion_neta']['valor_monetario']
-            total_prod_real += valores['produccion_real']['valor_monetario']
-        
-        # Generar HTML
-        html = self._generar_html_estatico(
-            total_mt3=total_mt3,
-            total_horas=total_horas,
-            total_gastos=total_gastos,
-            total_prod_neta=total_prod_neta,
-            total_prod_real=total_prod_real,
-            datos_por_mes=datos_por_mes,
-            datos_por_maquina=datos_por_maquina,
-            incluir_gastos_operacionales=False
-        )
-        
-        return html
-    
-    def _generar_html_completo(
-        self,
-        datos: Dict[Tuple[str, int], Dict],
-        producciones: List[Produccion],
-        repuestos: List[Repuesto],
-        horas_hombre: List[HorasHombre],
-        gastos_operacionales: List[GastoOperacional]
-    ) -> str:
-        """Genera el contenido HTML completo con gastos operacionales."""
-        
-        # Calcular totales
-        total_mt3 = Decimal('0')
-        total_horas = Decimal('0')
-        total_gastos_op = Decimal('0')
-        total_repuestos = Decimal('0')
-        total_horas_hombre = Decimal('0')
-        total_costo_hh = Decimal('0')
-        total_leasing = Decimal('0')
-        total_combustibles = Decimal('0')
-        total_reparaciones = Decimal('0')
-        total_prod_neta = Decimal('0')
-        total_prod_real = Decimal('0')
-        total_gastos_completo = Decimal('0')
-        
-        # Datos por mes
-        datos_por_mes: Dict[int, List[Tuple[str, Dict]]] = {10: [], 11: [], 12: []}
-        datos_por_maquina: Dict[str, Dict[int, Dict]] = {}
-        
-        for (maquina, mes), valores in datos.items():
-            if maquina not in datos_por_maquina:
-                datos_por_maquina[maquina] = {}
-            datos_por_maquina[maquina][mes] = valores
-            datos_por_mes[mes].append((maquina, valores))
-            
-            total_mt3 += valores['produccion']['mt3']
-            total_horas += valores['produccion']['horas_trabajadas']
-            total_gastos_op += valores['gastos'].get('total_gastos_operacionales', Decimal('0'))
-            total_repuestos += valores['gastos'].get('repuestos', Decimal('0'))
-            total_horas_hombre += valores['gastos'].get('horas_hombre', Decimal('0'))
-            total_costo_hh += valores['gastos'].get('costo_hh', Decimal('0'))
-            total_leasing += valores['gastos'].get('leasing', Decimal('0'))
-            total_combustibles += valores['gastos'].get('combustibles', Decimal('0'))
-            total_reparaciones += valores['gastos'].get('reparaciones', Decimal('0'))
-            total_prod_neta += valores['produccion_neta']['valor_monetario']
-            total_prod_real += valores['produccion_real']['valor_monetario']
-            # Usar el total completo de gastos que ya incluye todo
-            total_gastos_completo += valores['gastos'].get('total', Decimal('0'))
-        
-        # Generar HTML
-        html = self._generar_html_estatico(
-            total_mt3=total_mt3,
-            total_horas=total_horas,
-            total_gastos=total_gastos_completo,
-            total_prod_neta=total_prod_neta,
-            total_prod_real=total_prod_real,
-            datos_por_mes=datos_por_mes,
-            datos_por_maquina=datos_por_maquina,
-            incluir_gastos_operacionales=True,
-            total_combustibles=total_combustibles,
-            total_reparaciones=total_reparaciones
-        )
-        
-        return html
-    
-    def _generar_html_estatico(
-        self,
-        total_mt3: Decimal,
-        total_horas: Decimal,
-        total_gastos: Decimal,
-        total_prod_neta: Decimal,
-        total_prod_real: Decimal,
-        datos_por_mes: Dict[int, List[Tuple[str, Dict]]],
-        datos_por_maquina: Dict[str, Dict[int, Dict]],
-        incluir_gastos_operacionales: bool = False,
-        total_combustibles: Optional[Decimal] = None,
-        total_reparaciones: Decimal = Decimal('0')
-    ) -> str:
-        """Genera el contenido HTML completo estático con datos ya incluidos."""
-        
-        # Generar filas de las tablas
-        filas_resumen_oct = self._generar_filas_resumen(datos_por_mes.get(10, []), incluir_gastos_operacionales)
-        filas_resumen_nov = self._generar_filas_resumen(datos_por_mes.get(11, []), incluir_gastos_operacionales)
-        filas_resumen_dic = self._generar_filas_resumen(datos_por_mes.get(12, []), incluir_gastos_operacionales)
-        filas_resumen_trimestral = self._generar_filas_resumen_trimestral(datos_por_maquina, incluir_gastos_operacionales)
-        filas_produccion = self._generar_filas_produccion(datos_por_maquina)
+_ZERO = Decimal('0')
 
-        # Generar filas de gastos por mes (para sub-tabs)
-        filas_gastos_oct = self._generar_filas_gastos_mes(datos_por_maquina, 10, incluir_gastos_operacionales)
-        filas_gastos_nov = self._generar_filas_gastos_mes(datos_por_maquina, 11, incluir_gastos_operacionales)
-        filas_gastos_dic = self._generar_filas_gastos_mes(datos_por_maquina, 12, incluir_gastos_operacionales)
-        filas_gastos_trimestral = self._generar_filas_resumen_gastos_trimestral(datos_por_maquina, incluir_gastos_operacionales)
-
-        # Generar headers de la tabla de gastos (sin columna Mes para sub-tabs)
-        if incluir_gastos_operacionales:
-            headers_tabla_gastos_sin_mes = """<tr>
-                        <th>Máquina</th>
-                        <th>Repuestos</th>
-                        <th>Horas HH</th>
-                        <th>Costo HH</th>
-                        <th>Leasing</th>
-                        <th>Combustibles</th>
-                        <th>Reparaciones</th>
-                        <th>Seguros</th>
-                        <th>Honorarios</th>
-                        <th>EPP</th>
-                        <th>Peajes</th>
-                        <th>Remuneraciones</th>
-                        <th>Permisos</th>
-                        <th>Alimentación</th>
-                        <th>Pasajes</th>
-                        <th>Correspondencia</th>
-                        <th>Gastos Legales</th>
-                        <th>Multas</th>
-                        <th>Otros</th>
-                        <th>Total Gastos</th>
-                    </tr>"""
-        else:
-            headers_tabla_gastos_sin_mes = """<tr>
-                        <th>Máquina</th>
-                        <th>Repuestos</th>
-                        <th>Horas Hombre</th>
-                        <th>Costo HH</th>
-                        <th>Leasing</th>
-                        <th>Total Gastos</th>
-                    </tr>"""
 
-        html = f"""<!DOCTYPE html>
-<html lang="es">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Informe Producción vs Gastos - Q4 2025</title>
-    <style>
-        * {{
+# Hoja de estilos del informe. Es idéntica en todas las exportaciones, así que
+# se arma una sola vez al importar el módulo: se incrusta en el <head> o se
+# escribe como archivo aparte (ver HTMLExporter(css_externo=True)).
+# Las reglas del filtro ocultan las filas del resumen que no corresponden al
+# periodo seleccionado (10, 11, 12 o T).
+_CSS_DASHBOARD = Template("""        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             padding: 20px;
             min-height: 100vh;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
             background: white;
             border-radius: 10px;
             box-shadow: 0 10px 40px rgba(0,0,0,0.2);
             padding: 30px;
-        }}
+        }
         
-        h1 {{
+        h1 {
             color: #333;
             text-align: center;
             margin-bottom: 10px;
             font-size: 2.5em;
-        }}
+        }
         
-        .subtitle {{
+        .subtitle {
             text-align: center;
             color: #666;
             margin-bottom: 30px;
             font-size: 1.2em;
-        }}
+        }
         
-        .summary-cards {{
+        .summary-cards {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 20px;
             margin-bottom: 40px;
-        }}
+        }
         
-        .card {{
+        .card {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 20px;
@@ -459,17 +84,17 @@ class HTMLExporter:
             min-width: 0;
             overflow: hidden;
             word-wrap: break-word;
-        }}
+        }
         
-        .card h3 {{
+        .card h3 {
             font-size: 0.9em;
             opacity: 0.9;
             margin-bottom: 10px;
             word-wrap: break-word;
             overflow-wrap: break-word;
-        }}
+        }
         
-        .card .value {{
+        .card .value {
             font-size: clamp(1.2em, 4vw, 2em);
             font-weight: bold;
             word-wrap: break-word;
@@ -478,79 +103,79 @@ class HTMLExporter:
             max-width: 100%;
             overflow: hidden;
             text-overflow: ellipsis;
-        }}
+        }
         
-        @media (max-width: 768px) {{
-            .summary-cards {{
+        @media (max-width: 768px) {
+            .summary-cards {
                 grid-template-columns: 1fr;
                 gap: 15px;
-            }}
+            }
             
-            .card {{
+            .card {
                 padding: 15px;
-            }}
+            }
             
-            .card .value {{
+            .card .value {
                 font-size: 1.5em;
-            }}
-        }}
+            }
+        }
         
-        @media (max-width: 480px) {{
-            .card .value {{
+        @media (max-width: 480px) {
+            .card .value {
                 font-size: 1.2em;
-            }}
+            }
             
-            .card h3 {{
+            .card h3 {
                 font-size: 0.8em;
-            }}
-        }}
+            }
+        }
         
-        .section {{
+        .section {
             margin-bottom: 50px;
-        }}
+        }
         
-        .section h2 {{
+        .section h2 {
             color: #333;
             margin-bottom: 20px;
             padding-bottom: 10px;
             border-bottom: 3px solid #667eea;
-        }}
+        }
         
-        .chart-container {{
+        .chart-container {
             position: relative;
             height: 400px;
             margin-bottom: 30px;
             background: #f8f9fa;
             padding: 20px;
             border-radius: 10px;
-        }}
+        }
         
-        table {{
+        table {
             width: 100%;
             border-collapse: collapse;
             margin-top: 20px;
             background: white;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
+        }
         
         /* Contenedor responsive para tablas anchas */
-        .table-responsive {{
+        .table-responsive {
             width: 100%;
             overflow-x: auto;
             -webkit-overflow-scrolling: touch;
             margin-bottom: 20px;
-        }}
+        }
         
-        .table-responsive table {{
+        .table-responsive table {
             min-width: 600px;
-        }}
+        }
         
         /* Para tablas con muchas columnas (gastos operacionales) */
-        #tabla-gastos {{
+        #tabla-gastos {
             min-width: 1800px;
-        }}
+        }
         
-        th {{
+        th {
             background: #667eea;
             color: white;
             padding: 12px 10px;
@@ -558,37 +183,37 @@ class HTMLExporter:
             font-weight: 600;
             white-space: nowrap;
             font-size: 0.85em;
-        }}
+        }
         
-        td {{
+        td {
             padding: 10px;
             border-bottom: 1px solid #eee;
             white-space: nowrap;
             font-size: 0.9em;
-        }}
+        }
         
-        tr:hover {{
+        tr:hover {
             background: #f8f9fa;
-        }}
+        }
         
-        .positive {{
+        .positive {
             color: #28a745;
             font-weight: bold;
-        }}
+        }
         
-        .negative {{
+        .negative {
             color: #dc3545;
             font-weight: bold;
-        }}
-        .tabs {{
+        }
+        .tabs {
             display: flex;
             gap: 10px;
             margin-bottom: 20px;
             border-bottom: 2px solid #667eea;
             padding-bottom: 10px;
-        }}
+        }
         
-        .tab {{
+        .tab {
             padding: 10px 20px;
             background: #f0f0f0;
             border: none;
@@ -597,25 +222,48 @@ class HTMLExporter:
             font-size: 1em;
             font-weight: 600;
             transition: all 0.3s ease;
-        }}
+        }
         
-        .tab:hover {{
+        .tab:hover {
             background: #e0e0e0;
-        }}
+        }
         
-        .tab.active {{
+        .tab.active {
             background: #667eea;
             color: white;
-        }}
+        }
         
-        .tab-content {{
+$css_filtro_resumen
+        #tabla-resumen.show-T thead tr[data-periodo="mensual"],
+        #tabla-resumen:not(.show-T) thead tr[data-periodo="T"] { display: none; }
+
+        .tab-content {
             display: none;
-        }}
+        }
         
-        .tab-content.active {{
+        .tab-content.active {
             display: block;
-        }}
-    </style>
+        }
+""").substitute(
+    css_filtro_resumen='\n'.join(
+        f'        #tabla-resumen.show-{mes} tr[data-mes]:not([data-mes="{mes}"]) {{ display: none; }}'
+        for mes in ('10', '11', '12', 'T')
+    )
+)
+
+_NOMBRE_CSS = 'dashboard.css'
+
+
+# Esqueleto estático del informe (estructura y JS de navegación).
+# Se compila una sola vez al importar el módulo; las partes variables son
+# placeholders $nombre que se completan con substitute().
+_PLANTILLA_HTML = Template("""<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Informe Producción vs Gastos - Q4 2025</title>
+    $estilos
 </head>
 <body>
     <div class="container">
@@ -632,113 +280,66 @@ class HTMLExporter:
         <div class="summary-cards">
             <div class="card">
                 <h3>Total Gastos</h3>
-                <div class="value">{self._formatear_moneda(total_gastos)}</div>
-                <p style="font-size: 0.7em; margin-top: 5px; opacity: 0.8;">Repuestos (sin IVA) + HH × $35.000 + Leasing (neto, IVA descontado)</p>
+                <div class="value">${total_gastos}</div>
+                <p style="font-size: 0.7em; margin-top: 5px; opacity: 0.8;">Repuestos (sin IVA) + HH × $$35.000 + Leasing (neto, IVA descontado)</p>
             </div>
             <div class="card">
                 <h3>Total Producción Neta</h3>
-                <div class="value">{self._formatear_moneda(total_prod_neta)}</div>
+                <div class="value">${total_prod_neta}</div>
                 <p style="font-size: 0.7em; margin-top: 5px; opacity: 0.8;">Valores netos (sin IVA)</p>
             </div>
             <div class="card">
                 <h3>Total Producción Real</h3>
-                <div class="value">{self._formatear_moneda(total_prod_real)}</div>
+                <div class="value">${total_prod_real}</div>
                 <p style="font-size: 0.7em; margin-top: 5px; opacity: 0.8;">Prod. Neta - Gastos Totales (valores netos)</p>
             </div>
         </div>
 
-        <div class="tabs">
-            <button class="tab active" onclick="mostrarTab('resumen')">📊 Resumen Trimestral</button>
-            <button class="tab" onclick="mostrarTab('produccion')">🏭 Detalle Producción</button>
-            <button class="tab" onclick="mostrarTab('gastos')">💰 Detalle Gastos</button>
+        <div class="tabs" data-nav="principal">
+            <button class="tab active" data-destino="resumen">📊 Resumen Trimestral</button>
+            <button class="tab" data-destino="produccion">🏭 Detalle Producción</button>
+            <button class="tab" data-destino="gastos">💰 Detalle Gastos</button>
         </div>
         
         <!-- Tab: Resumen Trimestral -->
         <div id="tab-resumen" class="tab-content active">
             <div class="section">
                 <h2>📊 Resumen Trimestral</h2>
-            <div class="tabs">
-                <button class="tab active" onclick="mostrarSubTab('tab-resumen-oct')">Octubre 2025</button>
-                <button class="tab" onclick="mostrarSubTab('tab-resumen-nov')">Noviembre 2025</button>
-                <button class="tab" onclick="mostrarSubTab('tab-resumen-dic')">Diciembre 2025</button>
-                <button class="tab" onclick="mostrarSubTab('tab-resumen-trimestral')">Resumen Trimestral (Total)</button>
+            <div class="tabs" data-nav="resumen">
+                <button class="tab active" data-destino="10">Octubre 2025</button>
+                <button class="tab" data-destino="11">Noviembre 2025</button>
+                <button class="tab" data-destino="12">Diciembre 2025</button>
+                <button class="tab" data-destino="T">Resumen Trimestral (Total)</button>
             </div>
-            <div id="tab-resumen-oct" class="tab-content active">
-            <h3 style="margin-top: 20px; color: #333;">Octubre 2025</h3>
-            <table id="tabla-resumen-oct" class="tabla-mensual">
+            <h3 id="titulo-resumen" style="margin-top: 20px; color: #333;">Octubre 2025</h3>
+            <table id="tabla-resumen" class="tabla-mensual show-10">
                 <thead>
-                    <tr>
+                    <tr data-periodo="mensual">
                         <th>Máquina</th>
                         <th>Producción</th>
                         <th>Prod. Neta</th>
                         <th>Gastos</th>
                         <th>Prod. Real</th>
                     </tr>
+                    <tr data-periodo="T">
+                        <th>Máquina</th>
+                        <th>Total Producción</th>
+                        <th>Total Prod. Neta</th>
+                        <th>Total Gastos</th>
+                        <th>Total Prod. Real</th>
+                    </tr>
                 </thead>
                 <tbody>
-                    {filas_resumen_oct}
+                    ${filas_resumen}
                 </tbody>
             </table>
-            </div>
-            
-            <div id="tab-resumen-nov" class="tab-content">
-            <h3 style="margin-top: 40px; color: #333;">Noviembre 2025</h3>
-            <table id="tabla-resumen-nov" class="tabla-mensual">
-                <thead>
-                    <tr>
-                        <th>Máquina</th>
-                        <th>Producción</th>
-                        <th>Prod. Neta</th>
-                        <th>Gastos</th>
-                        <th>Prod. Real</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {filas_resumen_nov}
-                </tbody>
-            </table>
-            </div>
-            <div id="tab-resumen-dic" class="tab-content">
-            <h3 style="margin-top: 40px; color: #333;">Diciembre 2025</h3>
-            <table id="tabla-resumen-dic" class="tabla-mensual">
-                <thead>
-                    <tr>
-                        <th>Máquina</th>
-                        <th>Producción</th>
-                        <th>Prod. Neta</th>
-                        <th>Gastos</th>
-                        <th>Prod. Real</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {filas_resumen_dic}
-                </tbody>
-            </table>
-            </div>
-            <div id="tab-resumen-trimestral" class="tab-content">
-            <h3 style="margin-top: 40px; color: #333;">Resumen Trimestral (Total)</h3>
-            <table id="tabla-resumen-trimestral">
-                <thead>
-                    <tr>
-                        <th>Máquina</th>
-                        <th>Total Producción</th>
-                        <th>Total Prod. Neta</th>
-                        <th>Total Gastos</th>
-                        <th>Total Prod. Real</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {filas_resumen_trimestral}
-                </tbody>
-            </table>
-            </div>
-        </div>
-        </div>
-        <!-- Tab: Detalle Producción -->
-        <div id="tab-produccion" class="tab-content">
-            <div class="section">
-                <h2>🏭 Detalle Producción</h2>
-                <table id="tabla-produccion">
+        </div>
+        </div>
+        <!-- Tab: Detalle Producción -->
+        <div id="tab-produccion" class="tab-content">
+            <div class="section">
+                <h2>🏭 Detalle Producción</h2>
+                <table id="tabla-produccion">
                 <thead>
                     <tr>
                         <th>Máquina</th>
@@ -750,7 +351,7 @@ class HTMLExporter:
                     </tr>
                 </thead>
                 <tbody>
-                    {filas_produccion}
+                    ${filas_produccion}
                 </tbody>
             </table>
             </div>
@@ -760,63 +361,21 @@ class HTMLExporter:
         <div id="tab-gastos" class="tab-content">
             <div class="section">
                 <h2>💰 Gastos por Máquina</h2>
-            <div class="tabs">
-                <button class="tab active" onclick="mostrarSubTabGastos('tab-gastos-oct')">Octubre 2025</button>
-                <button class="tab" onclick="mostrarSubTabGastos('tab-gastos-nov')">Noviembre 2025</button>
-                <button class="tab" onclick="mostrarSubTabGastos('tab-gastos-dic')">Diciembre 2025</button>
-                <button class="tab" onclick="mostrarSubTabGastos('tab-gastos-trimestral')">Resumen Trimestral</button>
-            </div>
-            <div id="tab-gastos-oct" class="tab-content active">
-            <h3 style="margin-top: 20px; color: #333;">Octubre 2025</h3>
-            <div class="table-responsive">
-                <table id="tabla-gastos-oct" class="tabla-mensual">
-                <thead>
-                    {headers_tabla_gastos_sin_mes}
-                </thead>
-                <tbody>
-                    {filas_gastos_oct}
-                </tbody>
-                </table>
-            </div>
-            </div>
-
-            <div id="tab-gastos-nov" class="tab-content">
-            <h3 style="margin-top: 40px; color: #333;">Noviembre 2025</h3>
-            <div class="table-responsive">
-                <table id="tabla-gastos-nov" class="tabla-mensual">
-                <thead>
-                    {headers_tabla_gastos_sin_mes}
-                </thead>
-                <tbody>
-                    {filas_gastos_nov}
-                </tbody>
-                </table>
-            </div>
-            </div>
-
-            <div id="tab-gastos-dic" class="tab-content">
-            <h3 style="margin-top: 40px; color: #333;">Diciembre 2025</h3>
-            <div class="table-responsive">
-                <table id="tabla-gastos-dic" class="tabla-mensual">
-                <thead>
-                    {headers_tabla_gastos_sin_mes}
-                </thead>
-                <tbody>
-                    {filas_gastos_dic}
-                </tbody>
-                </table>
-            </div>
+            <div class="tabs" data-nav="gastos">
+${botones_gastos_meses}
+                <button class="tab" data-destino="tab-gastos-trimestral">Resumen Trimestral</button>
             </div>
+${tablas_gastos_meses}
 
             <div id="tab-gastos-trimestral" class="tab-content">
             <h3 style="margin-top: 40px; color: #333;">Resumen Trimestral</h3>
             <div class="table-responsive">
                 <table id="tabla-gastos-trimestral">
                 <thead>
-                    {headers_tabla_gastos_sin_mes}
+                    ${headers_tabla_gastos_sin_mes}
                 </thead>
                 <tbody>
-                    {filas_gastos_trimestral}
+                    ${filas_gastos_trimestral}
                 </tbody>
                 </table>
             </div>
@@ -826,682 +385,726 @@ class HTMLExporter:
     </div>
     
     <script>
-        function mostrarTab(tabId) {{
-            // Ocultar solo los tabs principales (hijos directos del contenedor principal)
-            const mainTabContents = document.querySelectorAll('.container > .tabs + .tab-content, .container > .tab-content');
-            mainTabContents.forEach(content => {{
-                // Solo afectar tabs principales, no subtabs
-                if (content.id === 'tab-resumen' || content.id === 'tab-produccion' || content.id === 'tab-gastos') {{
-                    content.classList.remove('active');
-                }}
-            }});
-            
-            // Desactivar solo los botones de tabs principales
-            const mainTabs = document.querySelectorAll('.container > .tabs > .tab');
-            mainTabs.forEach(tab => {{
-                tab.classList.remove('active');
-            }});
+        // La estructura de tabs es estática: se consulta una sola vez al cargar
+        const CONTENIDOS_PRINCIPALES = ['resumen', 'produccion', 'gastos'].map(id => document.getElementById('tab-' + id));
+        const TABS_PRINCIPALES = document.querySelectorAll('.container > .tabs > .tab');
+        const SUBTABS_RESUMEN = document.querySelectorAll('#tab-resumen .tabs > .tab');
+        const TABLA_RESUMEN = document.getElementById('tabla-resumen');
+        const TITULO_RESUMEN = document.getElementById('titulo-resumen');
+        const CONTENIDOS_GASTOS = document.querySelectorAll('#tab-gastos .tab-content[id^="tab-gastos-"]');
+        const SUBTABS_GASTOS = document.querySelectorAll('#tab-gastos .tabs > .tab');
+
+        function mostrarTab(tabId, boton) {
+            // Ocultar solo los tabs principales, no los subtabs
+            CONTENIDOS_PRINCIPALES.forEach(content => content.classList.remove('active'));
+            TABS_PRINCIPALES.forEach(tab => tab.classList.remove('active'));
             
             // Mostrar el contenido del tab seleccionado
             document.getElementById('tab-' + tabId).classList.add('active');
             
             // Activar el tab seleccionado
-            event.target.classList.add('active');
-            
-            // Si volvemos al tab de resumen, asegurar que el subtab activo se muestre
-            if (tabId === 'resumen') {{
-                const activeSubTab = document.querySelector('#tab-resumen .tab-content.active');
-                if (!activeSubTab) {{
-                    // Si no hay subtab activo, activar el primero
-                    const firstSubTab = document.getElementById('tab-resumen-oct');
-                    const firstSubTabBtn = document.querySelector('#tab-resumen .tabs > .tab');
-                    if (firstSubTab) firstSubTab.classList.add('active');
-                    if (firstSubTabBtn) firstSubTabBtn.classList.add('active');
-                }}
-            }}
-        }}
+            boton.classList.add('active');
+        }
 
-        function mostrarSubTab(subTabId) {{
-            // Solo afectar los subtabs dentro de #tab-resumen
-            const subContents = document.querySelectorAll('#tab-resumen > .section .tab-content, #tab-resumen .tab-content[id^="tab-resumen-"]');
-            const subTabs = document.querySelectorAll('#tab-resumen .tabs > .tab');
+        function mostrarSubTab(mes, boton) {
+            // El filtrado de filas lo resuelve el CSS según la clase show-<mes> de la tabla
+            TABLA_RESUMEN.className = 'tabla-mensual show-' + mes;
+            TITULO_RESUMEN.textContent = boton.textContent;
 
-            subContents.forEach(c => {{
-                if (c.id && c.id.startsWith('tab-resumen-')) {{
-                    c.classList.remove('active');
-                }}
-            }});
-            subTabs.forEach(t => t.classList.remove('active'));
-
-            document.getElementById(subTabId).classList.add('active');
-            event.target.classList.add('active');
-        }}
+            SUBTABS_RESUMEN.forEach(t => t.classList.remove('active'));
+            boton.classList.add('active');
+        }
 
-        function mostrarSubTabGastos(subTabId) {{
+        function mostrarSubTabGastos(subTabId, boton) {
             // Solo afectar los subtabs dentro de #tab-gastos
-            const subContents = document.querySelectorAll('#tab-gastos .tab-content[id^="tab-gastos-"]');
-            const subTabs = document.querySelectorAll('#tab-gastos .tabs > .tab');
-
-            subContents.forEach(c => {{
-                if (c.id && c.id.startsWith('tab-gastos-')) {{
-                    c.classList.remove('active');
-                }}
-            }});
-            subTabs.forEach(t => t.classList.remove('active'));
+            CONTENIDOS_GASTOS.forEach(c => c.classList.remove('active'));
+            SUBTABS_GASTOS.forEach(t => t.classList.remove('active'));
 
             document.getElementById(subTabId).classList.add('active');
-            event.target.classList.add('active');
-        }}
+            boton.classList.add('active');
+        }
+
+        // Un único listener delegado para todos los grupos de tabs (data-nav indica el grupo)
+        const NAVEGACION = { principal: mostrarTab, resumen: mostrarSubTab, gastos: mostrarSubTabGastos };
+        document.querySelector('.container').addEventListener('click', e => {
+            const boton = e.target.closest('.tabs > .tab');
+            if (!boton) return;
+            NAVEGACION[boton.parentElement.dataset.nav](boton.dataset.destino, boton);
+        });
     </script>
 </body>
 </html>
-"""
-        return html
+""")
+
+
+def _partir_plantilla(plantilla: Template) -> List[Tuple[str, Optional[str]]]:
+    """
+    Parte una plantilla en segmentos (texto literal, placeholder siguiente).
     
-    def _generar_filas_resumen(self, datos: List[Tuple[str, Dict]], incluir_gastos_operacionales: bool = False) -> str:
-        """Genera las filas de la tabla de resumen mensual."""
-        filas = []
+    Permite escribir el documento por partes, intercalando los valores
+    sin construir primero el string completo.
+    """
+    segmentos: List[Tuple[str, Optional[str]]] = []
+    literal: List[str] = []
+    inicio = 0
+    for coincidencia in plantilla.pattern.finditer(plantilla.template):
+        literal.append(plantilla.template[inicio:coincidencia.start()])
+        inicio = coincidencia.end()
+        if coincidencia.group('escaped') is not None:
+            literal.append(plantilla.delimiter)
+            continue
+        nombre = coincidencia.group('named') or coincidencia.group('braced')
+        segmentos.append((''.join(literal), nombre))
+        literal = []
+    literal.append(plantilla.template[inicio:])
+    segmentos.append((''.join(literal), None))
+    return segmentos
+
+
+_SEGMENTOS_HTML = _partir_plantilla(_PLANTILLA_HTML)
+
+
+class HTMLExporter:
+    """
+    Exporta los datos del informe a un archivo HTML.
+    
+    Crea un dashboard interactivo con:
+    - Resumen ejecutivo
+    - Gráficos de producción vs gastos
+    - Tablas con datos ya incluidos (estático)
+    - Tabs y sub-tabs para navegación
+    - Detalle por máquina
+    """
+    
+    MESES = {
+        10: 'Octubre',
+        11: 'Noviembre',
+        12: 'Diciembre'
+    }
+    
+    # Clase CSS de la producción real según su signo (negativo, cero, positivo)
+    CLASES_PROD_REAL = ('negative', '', 'positive')
+    
+    # Sufijo de los ids de las sub-tabs de gastos por mes
+    ID_MES = {
+        10: 'oct',
+        11: 'nov',
+        12: 'dic'
+    }
+    
+    # Headers de las tablas de gastos (sin columna Mes)
+    HEADERS_GASTOS_OPERACIONALES = """<tr>
+                        <th>Máquina</th>
+                        <th>Repuestos</th>
+                        <th>Horas HH</th>
+                        <th>Costo HH</th>
+                        <th>Leasing</th>
+                        <th>Combustibles</th>
+                        <th>Reparaciones</th>
+                        <th>Seguros</th>
+                        <th>Honorarios</th>
+                        <th>EPP</th>
+                        <th>Peajes</th>
+                        <th>Remuneraciones</th>
+                        <th>Permisos</th>
+                        <th>Alimentación</th>
+                        <th>Pasajes</th>
+                        <th>Correspondencia</th>
+                        <th>Gastos Legales</th>
+                        <th>Multas</th>
+                        <th>Otros</th>
+                        <th>Total Gastos</th>
+                    </tr>"""
+    
+    HEADERS_GASTOS_BASICOS = """<tr>
+                        <th>Máquina</th>
+                        <th>Repuestos</th>
+                        <th>Horas Hombre</th>
+                        <th>Costo HH</th>
+                        <th>Leasing</th>
+                        <th>Total Gastos</th>
+                    </tr>"""
+    
+    # Botón y contenido de la sub-tab de gastos de un mes
+    BOTON_GASTOS_MES = """                <button class="tab{activo}" data-destino="tab-gastos-{id}">{nombre} 2025</button>"""
+    
+    BLOQUE_GASTOS_MES = """            <div id="tab-gastos-{id}" class="tab-content{activo}">
+            <h3 style="margin-top: {margen}px; color: #333;">{nombre} 2025</h3>
+            <div class="table-responsive">
+                <table id="tabla-gastos-{id}" class="tabla-mensual">
+                <thead>
+                    {headers}
+                </thead>
+                <tbody>
+                    {filas}
+                </tbody>
+                </table>
+            </div>
+            </div>"""
+    
+    # Plantilla compartida por las filas mensuales y trimestrales del resumen:
+    # maquina, mes, producción, prod. neta, gastos, clase prod. real, prod. real
+    FILA_RESUMEN = """<tr data-maquina="{0}" data-mes="{1}">
+                    <td>{0}</td>
+                    <td>{2}</td>
+                    <td>{3}</td>
+                    <td>{4}</td>
+                    <td class="{5}">{6}</td>
+                </tr>"""
+    
+    # Plantilla de fila de la tabla de producción:
+    # maquina, mes, nombre del mes, mt3, horas, kilómetros, vueltas
+    FILA_PRODUCCION = """<tr data-maquina="{0}" data-mes="{1}">
+                        <td>{0}</td>
+                        <td>{2}</td>
+                        <td>{3}</td>
+                        <td>{4}</td>
+                        <td>{5}</td>
+                        <td>{6}</td>
+                    </tr>"""
+    
+    # Columnas de gasto que se muestran en las filas de las tablas de gastos
+    CAMPOS_FILA_GASTOS = (
+        'repuestos', 'horas_hombre', 'costo_hh', 'leasing', 'combustibles',
+        'reparaciones', 'seguros', 'honorarios', 'epp', 'peajes',
+        'remuneraciones', 'permisos', 'alimentacion', 'pasajes',
+        'correspondencia', 'gastos_legales', 'multas', 'otros_gastos'
+    )
+    
+    def __init__(
+        self,
+        ruta_salida: str,
+        css_externo: bool = False,
+        atributos_datos: bool = False,
+        comprimir: bool = False
+    ):
+        """
+        Inicializa el exportador.
         
-        # Ordenar por producción real
-        datos_ordenados = sorted(datos, key=lambda x: x[1]['produccion_real']['valor_monetario'])
+        Args:
+            ruta_salida: Ruta donde se guardará el archivo HTML
+            css_externo: Si es True, los estilos se escriben en dashboard.css
+                junto al HTML y se enlazan con <link>; por defecto se incrustan
+                para que el informe sea un único archivo autocontenido
+            atributos_datos: Si es True, las filas llevan data-maquina (y
+                data-mes en producción) para scripts externos. El data-mes del
+                resumen se emite siempre porque lo usa el filtro por periodo
+            comprimir: Si es True, el informe se escribe comprimido con gzip
+                en ruta_salida + '.gz' (p. ej. informe.html.gz)
+        """
+        self.ruta_salida = Path(ruta_salida)
+        self.comprimir = comprimir
+        self.css_externo = css_externo
+        self.atributos_datos = atributos_datos
+        if atributos_datos:
+            self._fila_resumen = self.FILA_RESUMEN
+            self._fila_produccion = self.FILA_PRODUCCION
+        else:
+            self._fila_resumen = self.FILA_RESUMEN.replace(' data-maquina="{0}"', '')
+            self._fila_produccion = self.FILA_PRODUCCION.replace(' data-maquina="{0}" data-mes="{1}"', '')
+    
+    def _atributos_fila(self, maquina: str) -> str:
+        """Atributos data-* de las filas de gastos (vacío salvo con atributos_datos=True)."""
+        return f' data-maquina="{maquina}"' if self.atributos_datos else ''
+    
+    def _formatear_moneda(self, valor: Decimal) -> str:
+        """Formatea un valor como moneda chilena."""
+        return formatear_moneda(valor)
+    
+    def _formatear_numero(self, valor: Decimal, decimales: int = 2) -> str:
+        """Formatea un número con decimales."""
+        return formatear_numero(valor, decimales)
+    
+    def _get_total_gastos(self, gastos: Dict, incluir_gastos_operacionales: bool = False) -> Decimal:
+        """
+        Obtiene el total de gastos de manera segura.
         
-        for maquina, valores in datos_ordenados:
-            prod = valores['produccion']
-            prod_neta = valores['produccion_neta']
-            gastos = valores['gastos']
-            prod_real = valores['produccion_real']
+        Args:
+            gastos: Diccionario de gastos
+            incluir_gastos_operacionales: Si True, el total ya incluye gastos operacionales
             
-            total_gastos = self._get_total_gastos(gastos, incluir_gastos_operacionales)
+        Returns:
+            Total de gastos (siempre incluye todos los gastos cuando hay operacionales)
+        """
+        # El 'total' siempre debe estar presente cuando hay gastos operacionales
+        # Si no está, intentamos calcularlo o retornamos 0
+        if 'total' in gastos:
+            return gastos['total']
+        elif incluir_gastos_operacionales and 'total_gastos_operacionales' in gastos:
+            # Si no hay 'total' pero hay gastos operacionales, calcularlo
+            return (gastos.get('repuestos', _ZERO) +
+                   gastos.get('costo_hh', _ZERO) +
+                   gastos.get('leasing', _ZERO) +
+                   gastos.get('total_gastos_operacionales', _ZERO))
+        else:
+            # Caso básico: solo repuestos + HH + leasing
+            return (gastos.get('repuestos', _ZERO) +
+                   gastos.get('costo_hh', _ZERO) +
+                   gastos.get('leasing', _ZERO))
+    
+    def exportar(
+        self,
+        producciones: List[Produccion],
+        repuestos: List[Repuesto],
+        horas_hombre: List[HorasHombre],
+        leasing: Optional[List[Leasing]] = None
+    ):
+        """
+        Exporta todos los datos a HTML.
+        
+        Args:
+            producciones: Lista de producciones
+            repuestos: Lista de repuestos
+            horas_hombre: Lista de horas hombre
+            leasing: Lista de leasing (opcional)
+        """
+        # Calcular datos agregados
+        datos = CalculadorProduccionReal.calcular_por_maquina_mes(
+            producciones, repuestos, horas_hombre, leasing or []
+        )
+        
+        # Generar HTML
+        partes = self._generar_html(datos, producciones, repuestos, horas_hombre)
+        
+        # Guardar archivo
+        self._escribir(partes)
+    
+    def exportar_completo(
+        self,
+        producciones: List[Produccion],
+        repuestos: List[Repuesto],
+        horas_hombre: List[HorasHombre],
+        gastos_operacionales: List[GastoOperacional],
+        leasing: Optional[List[Leasing]] = None
+    ):
+        """
+        Exporta todos los datos completos a HTML (producción + gastos operacionales).
+        
+        Args:
+            producciones: Lista de producciones
+            repuestos: Lista de repuestos
+            horas_hombre: Lista de horas hombre
+            gastos_operacionales: Lista de gastos de reportes contables
+            leasing: Lista de leasing (opcional)
+        """
+        # Calcular datos de producción real con gastos completos (incluyendo operacionales)
+        datos = CalculadorProduccionReal.calcular_por_maquina_mes_completo(
+            producciones, repuestos, horas_hombre, gastos_operacionales, leasing or []
+        )
+        
+        # También necesitamos los datos de gastos completos para el HTML
+        datos_gastos = CalculadorGastos.calcular_por_maquina_mes_completo(
+            repuestos, horas_hombre, gastos_operacionales, leasing or []
+        )
+        
+        # Actualizar los gastos en los datos combinados para asegurar consistencia
+        for clave in datos.keys():
+            if clave in datos_gastos:
+                # Asegurarse de que 'gastos' es un diccionario, no un Decimal
+                if isinstance(datos_gastos[clave], dict):
+                    datos[clave]['gastos'] = datos_gastos[clave]
+        
+        # Generar HTML
+        partes = self._generar_html_completo(datos, producciones, repuestos, horas_hombre, gastos_operacionales)
+        
+        # Guardar archivo
+        self._escribir(partes)
+    
+    def _estilos(self) -> str:
+        """Devuelve el bloque de estilos del <head>: incrustado o enlazado a dashboard.css."""
+        if self.css_externo:
+            return f'<link rel="stylesheet" href="{_NOMBRE_CSS}">'
+        return f"<style>\n{_CSS_DASHBOARD}    </style>"
+    
+    def _escribir_css(self):
+        """Escribe dashboard.css junto al HTML solo si falta o quedó desactualizado."""
+        ruta_css = self.ruta_salida.with_name(_NOMBRE_CSS)
+        if ruta_css.exists() and ruta_css.read_text(encoding='utf-8') == _CSS_DASHBOARD:
+            return
+        ruta_css.write_text(_CSS_DASHBOARD, encoding='utf-8')
+    
+    def _escribir(self, partes: Iterable[str]):
+        """Escribe el HTML por partes con un buffer amplio, sin armar un único string."""
+        if self.css_externo:
+            self._escribir_css()
+        escribir_partes(self.ruta_salida, partes, self.comprimir)
+    
+    def _generar_html(
+        self,
+        datos: Dict[Tuple[str, int], Dict],
+        producciones: List[Produccion],
+        repuestos: List[Repuesto],
+        horas_hombre: List[HorasHombre]
+    ) -> Iterator[str]:
+        """Genera el contenido HTML completo estático, por partes."""
+        
+        datos_por_mes, datos_por_maquina, totales = self._agrupar_datos(datos)
+        
+        # Generar HTML
+        return self._generar_html_estatico(
+            total_mt3=totales['mt3'],
+            total_horas=totales['horas'],
+            total_gastos=totales['total'],
+            total_prod_neta=totales['prod_neta'],
+            total_prod_real=totales['prod_real'],
+            datos_por_mes=datos_por_mes,
+            datos_por_maquina=datos_por_maquina,
+            incluir_gastos_operacionales=False
+        )
+    
+    def _generar_html_completo(
+        self,
+        datos: Dict[Tuple[str, int], Dict],
+        producciones: List[Produccion],
+        repuestos: List[Repuesto],
+        horas_hombre: List[HorasHombre],
+        gastos_operacionales: List[GastoOperacional]
+    ) -> Iterator[str]:
+        """Genera el contenido HTML completo con gastos operacionales, por partes."""
+        
+        # El total de gastos ya incluye repuestos, HH, leasing y gastos operacionales
+        datos_por_mes, datos_por_maquina, totales = self._agrupar_datos(
+            datos, campos_gastos=('total', 'combustibles', 'reparaciones')
+        )
+        
+        # Generar HTML
+        return self._generar_html_estatico(
+            total_mt3=totales['mt3'],
+            total_horas=totales['horas'],
+            total_gastos=totales['total'],
+            total_prod_neta=totales['prod_neta'],
+            total_prod_real=totales['prod_real'],
+            datos_por_mes=datos_por_mes,
+            datos_por_maquina=datos_por_maquina,
+            incluir_gastos_operacionales=True,
+            total_combustibles=totales['combustibles'],
+            total_reparaciones=totales['reparaciones']
+        )
+    
+    def _agrupar_datos(
+        self,
+        datos: Dict[Tuple[str, int], Dict],
+        campos_gastos: Tuple[str, ...] = ('total',)
+    ) -> Tuple[Dict[int, List[Tuple[str, Dict]]], Dict[str, Dict[int, Dict]], Dict[str, Decimal]]:
+        """
+        Agrupa los datos por mes y por máquina y calcula los totales generales.
+        
+        En la misma pasada se reúnen los valores de cada métrica en columnas
+        (una lista por métrica) que luego se suman con sum(), en lugar de
+        acumular con += fila a fila.
+        
+        Args:
+            datos: Datos por (máquina, mes)
+            campos_gastos: Campos de 'gastos' a totalizar
             
-            fila = f"""<tr data-maquina="{maquina}">
-                    <td>{maquina}</td>
-                    <td>{self._formatear_numero(prod['mt3'], 0)} MT3, {self._formatear_numero(prod['horas_trabajadas'], 0)} H</td>
-                    <td>{self._formatear_moneda(prod_neta['valor_monetario'])}</td>
-                    <td>{self._formatear_moneda(total_gastos)}</td>
-                    <td class="{self._get_clase_prod_real(prod_real['valor_monetario'])}">{self._formatear_moneda(prod_real['valor_monetario'])}</td>
-                </tr>"""
-            filas.append(fila)
+        Returns:
+            Tupla (datos_por_mes, datos_por_maquina, totales)
+        """
+        datos_por_mes: Dict[int, List[Tuple[str, Dict]]] = {10: [], 11: [], 12: []}
+        datos_por_maquina: Dict[str, Dict[int, Dict]] = defaultdict(dict)
         
-        return '\n'.join(filas)
+        columnas: Dict[str, List[Decimal]] = {'mt3': [], 'horas': [], 'prod_neta': [], 'prod_real': []}
+        columnas_gastos: Dict[str, List[Decimal]] = {campo: [] for campo in campos_gastos}
+        col_mt3 = columnas['mt3']
+        col_horas = columnas['horas']
+        col_prod_neta = columnas['prod_neta']
+        col_prod_real = columnas['prod_real']
+        
+        for (maquina, mes), valores in datos.items():
+            # Nombre internado: las búsquedas repetidas por máquina comparan por identidad
+            maquina = sys.intern(maquina)
+            datos_por_maquina[maquina][mes] = valores
+            
+            prod = valores['produccion']
+            gastos = valores['gastos']
+            col_mt3.append(prod['mt3'])
+            col_horas.append(prod['horas_trabajadas'])
+            col_prod_neta.append(valores['produccion_neta']['valor_monetario'])
+            col_prod_real.append(valores['produccion_real']['valor_monetario'])
+            # Los calculadores garantizan todas las claves de gastos: acceso directo
+            for campo, columna in columnas_gastos.items():
+                columna.append(gastos[campo])
+        
+        # Listas planas por mes en el orden de las máquinas, para que las
+        # tablas mensuales no tengan que recorrer todas las máquinas por mes
+        for maquina, valores_por_mes in datos_por_maquina.items():
+            for mes, valores in valores_por_mes.items():
+                datos_por_mes[mes].append((maquina, valores))
+        
+        columnas.update(columnas_gastos)
+        totales = {nombre: sum(columna, _ZERO) for nombre, columna in columnas.items()}
+        
+        return datos_por_mes, dict(datos_por_maquina), totales
     
-    def _generar_filas_resumen_trimestral(self, datos_por_maquina: Dict[str, Dict[int, Dict]], incluir_gastos_operacionales: bool = False) -> str:
-        """Genera las filas de la tabla de resumen trimestral."""
-        filas = []
+    def _generar_html_estatico(
+        self,
+        total_mt3: Decimal,
+        total_horas: Decimal,
+        total_gastos: Decimal,
+        total_prod_neta: Decimal,
+        total_prod_real: Decimal,
+        datos_por_mes: Dict[int, List[Tuple[str, Dict]]],
+        datos_por_maquina: Dict[str, Dict[int, Dict]],
+        incluir_gastos_operacionales: bool = False,
+        total_combustibles: Optional[Decimal] = None,
+        total_reparaciones: Decimal = Decimal('0')
+    ) -> Iterator[str]:
+        """Genera el contenido HTML completo estático con datos ya incluidos, por partes."""
+        
+        # Generar filas de las tablas
+        # Resumen: una sola tabla con filas etiquetadas por data-mes (10, 11, 12 o T)
+        # En la misma pasada se acumulan los gastos trimestrales por máquina
+        resumen_por_periodo, gastos_trimestrales = self._agrupar_resumen(datos_por_maquina, incluir_gastos_operacionales)
+        filas_resumen = '\n'.join(
+            self._generar_filas_resumen(resumen_por_periodo[periodo], periodo)
+            for periodo in ('10', '11', '12', 'T')
+        )
+        filas_produccion = self._generar_filas_produccion(datos_por_maquina)
+
+        filas_gastos_trimestral = self._generar_filas_resumen_gastos_trimestral(gastos_trimestrales, incluir_gastos_operacionales)
+
+        # Headers de la tabla de gastos (sin columna Mes para sub-tabs)
+        headers_tabla_gastos_sin_mes = self.HEADERS_GASTOS_OPERACIONALES if incluir_gastos_operacionales else self.HEADERS_GASTOS_BASICOS
+
+        # Sub-tabs y tablas de gastos por mes, a partir de los meses presentes
+        meses = list(datos_por_mes)
+        botones_gastos_meses = '\n'.join(
+            self.BOTON_GASTOS_MES.format(
+                activo=' active' if indice == 0 else '',
+                id=self.ID_MES[mes],
+                nombre=self.MESES[mes]
+            )
+            for indice, mes in enumerate(meses)
+        )
+        tablas_gastos_meses = '\n\n'.join(
+            self.BLOQUE_GASTOS_MES.format(
+                activo=' active' if indice == 0 else '',
+                margen=20 if indice == 0 else 40,
+                id=self.ID_MES[mes],
+                nombre=self.MESES[mes],
+                headers=headers_tabla_gastos_sin_mes,
+                filas=self._generar_filas_gastos_mes(datos_por_mes[mes], incluir_gastos_operacionales)
+            )
+            for indice, mes in enumerate(meses)
+        )
+
+        valores = dict(
+            estilos=self._estilos(),
+            total_gastos=self._formatear_moneda(total_gastos),
+            total_prod_neta=self._formatear_moneda(total_prod_neta),
+            total_prod_real=self._formatear_moneda(total_prod_real),
+            filas_resumen=filas_resumen,
+            filas_produccion=filas_produccion,
+            headers_tabla_gastos_sin_mes=headers_tabla_gastos_sin_mes,
+            botones_gastos_meses=botones_gastos_meses,
+            tablas_gastos_meses=tablas_gastos_meses,
+            filas_gastos_trimestral=filas_gastos_trimestral
+        )
+        for literal, nombre in _SEGMENTOS_HTML:
+            yield literal
+            if nombre is not None:
+                yield valores[nombre]
+    
+    def _agrupar_resumen(
+        self,
+        datos_por_maquina: Dict[str, Dict[int, Dict]],
+        incluir_gastos_operacionales: bool = False
+    ) -> Tuple[Dict[str, List[Tuple]], List[Tuple[str, Dict[str, Decimal], Decimal]]]:
+        """
+        Agrupa en una sola pasada por máquina los valores del resumen mensual y trimestral.
+        
+        En la misma iteración acumula también los gastos trimestrales por
+        columna, que reutiliza la tabla de resumen trimestral de gastos.
+        
+        Returns:
+            Tupla (resumen, gastos_trimestrales):
+            - resumen: {'10' | '11' | '12' | 'T': [(maquina, mt3, horas, prod_neta, gastos, prod_real), ...]}
+            - gastos_trimestrales: [(maquina, {campo: total}, total_gastos), ...]
+        """
+        resumen: Dict[str, List[Tuple]] = {'10': [], '11': [], '12': [], 'T': []}
+        gastos_trimestrales: List[Tuple[str, Dict[str, Decimal], Decimal]] = []
+        campos = self.CAMPOS_FILA_GASTOS if incluir_gastos_operacionales else self.CAMPOS_FILA_GASTOS[:4]
         
-        # Calcular totales por máquina
-        totales_por_maquina = {}
         for maquina, datos_por_mes in datos_por_maquina.items():
-            total_prod = {'mt3': Decimal('0'), 'horas': Decimal('0')}
-            total_prod_neta = Decimal('0')
-            total_gastos = Decimal('0')
-            total_prod_real = Decimal('0')
+            total_mt3 = _ZERO
+            total_horas = _ZERO
+            total_prod_neta = _ZERO
+            total_gastos = _ZERO
+            total_prod_real = _ZERO
+            totales_campos = dict.fromkeys(campos, _ZERO)
             
             for mes, valores in datos_por_mes.items():
                 prod = valores['produccion']
-                prod_neta = valores['produccion_neta']
-                gastos = valores['gastos']
-                prod_real = valores['produccion_real']
+                mt3 = prod['mt3']
+                horas = prod['horas_trabajadas']
+                prod_neta = valores['produccion_neta']['valor_monetario']
+                gastos_mes = valores['gastos']
+                gastos = self._get_total_gastos(gastos_mes, incluir_gastos_operacionales)
+                prod_real = valores['produccion_real']['valor_monetario']
                 
-                total_prod['mt3'] += prod['mt3']
-                total_prod['horas'] += prod['horas_trabajadas']
-                total_prod_neta += prod_neta['valor_monetario']
-                total_gastos += self._get_total_gastos(gastos, incluir_gastos_operacionales)
-                total_prod_real += prod_real['valor_monetario']
+                # Fila mensual y acumulado trimestral en la misma iteración
+                resumen[str(mes)].append((maquina, mt3, horas, prod_neta, gastos, prod_real))
+                total_mt3 += mt3
+                total_horas += horas
+                total_prod_neta += prod_neta
+                total_gastos += gastos
+                total_prod_real += prod_real
+                for campo in campos:
+                    totales_campos[campo] += gastos_mes.get(campo, _ZERO)
             
-            totales_por_maquina[maquina] = {
-                'total_prod': total_prod,
-                'total_prod_neta': total_prod_neta,
-                'total_gastos': total_gastos,
-                'total_prod_real': {'valor_monetario': total_prod_real}
-            }
-        
-        # Ordenar por producción real
-        maquinas_ordenadas = sorted(totales_por_maquina.keys(), key=lambda m: totales_por_maquina[m]['total_prod_real']['valor_monetario'])  # type: ignore
+            resumen['T'].append((maquina, total_mt3, total_horas, total_prod_neta, total_gastos, total_prod_real))
+            gastos_trimestrales.append((maquina, totales_campos, total_gastos))
         
-        for maquina in maquinas_ordenadas:
-            total = totales_por_maquina[maquina]  # type: Dict[str, Any]
-            
-            fila = f"""<tr data-maquina="{maquina}">
-                    <td>{maquina}</td>
-                    <td>{self._formatear_numero(total['total_prod']['mt3'], 0)} MT3, {self._formatear_numero(total['total_prod']['horas'], 0)} H</td>
-                    <td>{self._formatear_moneda(total['total_prod_neta'])}</td>
-                    <td>{self._formatear_moneda(total['total_gastos'])}</td>
-                    <td class="{self._get_clase_prod_real(total['total_prod_real']['valor_monetario'])}">{self._formatear_moneda(total['total_prod_real']['valor_monetario'])}</td>
-                </tr>"""
-            filas.append(fila)
+        return resumen, gastos_trimestrales
+    
+    def _generar_filas_resumen(self, datos: List[Tuple], mes: str) -> str:
+        """Genera las filas de la tabla de resumen (mensual o trimestral), etiquetadas con data-mes."""
+        plantilla = self._fila_resumen.format
         
-        return '\n'.join(filas)
+        # Ordenar por producción real
+        datos_ordenados = sorted(datos, key=itemgetter(5))
+        
+        return '\n'.join(
+            plantilla(
+                maquina,
+                mes,
+                f"{self._formatear_numero(mt3, 0)} MT3, {self._formatear_numero(horas, 0)} H",
+                self._formatear_moneda(prod_neta),
+                self._formatear_moneda(gastos),
+                self._get_clase_prod_real(prod_real),
+                self._formatear_moneda(prod_real)
+            )
+            for maquina, mt3, horas, prod_neta, gastos, prod_real in datos_ordenados
+        )
     
     def _generar_filas_produccion(self, datos_por_maquina: Dict[str, Dict[int, Dict]]) -> str:
         """Genera las filas de la tabla de producción."""
-        filas = []
-        
-        for maquina, datos_por_mes in datos_por_maquina.items():
-            for mes, valores in datos_por_mes.items():
-                prod = valores['produccion']
-                
-                fila = f"""<tr data-maquina="{maquina}" data-mes="{mes}">
-                        <td>{maquina}</td>
-                        <td>{self.MESES[int(mes)]}</td>
-                        <td>{self._formatear_numero(prod['mt3'], 0)}</td>
-                        <td>{self._formatear_numero(prod['horas_trabajadas'], 0)}</td>
-                        <td>{self._formatear_numero(prod['kilometros'], 0)}</td>
-                        <td>{self._formatear_numero(prod['vueltas'], 0)}</td>
-                    </tr>"""
-                filas.append(fila)
-
-        return '\n'.join(filas)
+        plantilla = self._fila_produccion.format
+        
+        return '\n'.join(
+            plantilla(
+                maquina,
+                mes,
+                self.MESES[mes],
+                self._formatear_numero(valores['produccion']['mt3'], 0),
+                self._formatear_numero(valores['produccion']['horas_trabajadas'], 0),
+                self._formatear_numero(valores['produccion']['kilometros'], 0),
+                self._formatear_numero(valores['produccion']['vueltas'], 0)
+            )
+            for maquina, datos_por_mes in datos_por_maquina.items()
+            for mes, valores in datos_por_mes.items()
+        )
 
-    def _generar_filas_gastos_mes(self, datos_por_maquina: Dict[str, Dict[int, Dict]], mes: int, incluir_gastos_operacionales: bool) -> str:
-        """Genera las filas de la tabla de gastos para un mes específico, ordenadas de mayor a menor por total de gastos."""
+    def _generar_filas_gastos_mes(self, datos_mes: List[Tuple[str, Dict]], incluir_gastos_operacionales: bool) -> str:
+        """
+        Genera las filas de la tabla de gastos para un mes específico, ordenadas de mayor a menor por total de gastos.
+        
+        Args:
+            datos_mes: Lista plana [(maquina, valores)] del mes, ya armada por _agrupar_datos
+            incluir_gastos_operacionales: Si True, muestra las columnas de gastos operacionales
+        """
         # Primero recopilar datos y calcular totales para poder ordenar
         datos_ordenados = []
-        for maquina, datos_por_mes in datos_por_maquina.items():
-            if mes in datos_por_mes:
-                valores = datos_por_mes[mes]
-                gastos = valores['gastos']
-                total_gastos = self._get_total_gastos(gastos, incluir_gastos_operacionales)
-                datos_ordenados.append((maquina, gastos, total_gastos))
+        for maquina, valores in datos_mes:
+            gastos = valores['gastos']
+            total_gastos = self._get_total_gastos(gastos, incluir_gastos_operacionales)
+            datos_ordenados.append((maquina, gastos, total_gastos))
 
         # Ordenar de mayor a menor por total de gastos
-        datos_ordenados.sort(key=lambda x: x[2], reverse=True)
+        datos_ordenados.sort(key=itemgetter(2), reverse=True)
 
         # Generar filas en el orden correcto
         filas = []
         for maquina, gastos, total_gastos in datos_ordenados:
             if incluir_gastos_operacionales:
-                fila = f"""<tr data-maquina="{maquina}">
+                fila = f"""<tr{self._atributos_fila(maquina)}>
                     <td>{maquina}</td>
-                    <td>{self._formatear_moneda(gastos.get('repuestos', Decimal('0')))}</td>
-                    <td>{self._formatear_numero(gastos.get('horas_hombre', Decimal('0')), 0)}</td>
-                    <td>{self._formatear_moneda(gastos.get('costo_hh', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('leasing', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('combustibles', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('reparaciones', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('seguros', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('honorarios', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('epp', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('peajes', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('remuneraciones', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('permisos', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('alimentacion', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('pasajes', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('correspondencia', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('gastos_legales', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('multas', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('otros_gastos', Decimal('0')))}</td>
+                    <td>{self._formatear_moneda(gastos.get('repuestos', _ZERO))}</td>
+                    <td>{self._formatear_numero(gastos.get('horas_hombre', _ZERO), 0)}</td>
+                    <td>{self._formatear_moneda(gastos.get('costo_hh', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('leasing', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('combustibles', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('reparaciones', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('seguros', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('honorarios', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('epp', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('peajes', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('remuneraciones', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('permisos', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('alimentacion', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('pasajes', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('correspondencia', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('gastos_legales', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('multas', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('otros_gastos', _ZERO))}</td>
                     <td><strong>{self._formatear_moneda(total_gastos)}</strong></td>
                 </tr>"""
             else:
-                fila = f"""<tr data-maquina="{maquina}">
+                fila = f"""<tr{self._atributos_fila(maquina)}>
                     <td>{maquina}</td>
-                    <td>{self._formatear_moneda(gastos.get('repuestos', Decimal('0')))}</td>
-                    <td>{self._formatear_numero(gastos.get('horas_hombre', Decimal('0')), 0)}</td>
-                    <td>{self._formatear_moneda(gastos.get('costo_hh', Decimal('0')))}</td>
-                    <td>{self._formatear_moneda(gastos.get('leasing', Decimal('0')))}</td>
+                    <td>{self._formatear_moneda(gastos.get('repuestos', _ZERO))}</td>
+                    <td>{self._formatear_numero(gastos.get('horas_hombre', _ZERO), 0)}</td>
+                    <td>{self._formatear_moneda(gastos.get('costo_hh', _ZERO))}</td>
+                    <td>{self._formatear_moneda(gastos.get('leasing', _ZERO))}</td>
                     <td>{self._formatear_moneda(total_gastos)}</td>
                 </tr>"""
             filas.append(fila)
 
         return '\n'.join(filas)
 
-    def _generar_filas_resumen_gastos_trimestral(self, datos_por_maquina: Dict[str, Dict[int, Dict]], incluir_gastos_operacionales: bool) -> str:
-        """Genera las filas del resumen trimestral de gastos, ordenadas de mayor a menor por total."""
+    def _generar_filas_resumen_gastos_trimestral(
+        self,
+        gastos_trimestrales: List[Tuple[str, Dict[str, Decimal], Decimal]],
+        incluir_gastos_operacionales: bool
+    ) -> str:
+        """
+        Genera las filas del resumen trimestral de gastos, ordenadas de mayor a menor por total.
+        
+        Args:
+            gastos_trimestrales: Totales por máquina ya acumulados por _agrupar_resumen
+            incluir_gastos_operacionales: Si True, muestra las columnas de gastos operacionales
+        """
         filas = []
 
-        # Primero calcular todos los totales trimestrales por máquina
-        totales_por_maquina = []
-        for maquina, datos_por_mes in datos_por_maquina.items():
-            # Calcular totales trimestrales
-            total_repuestos = Decimal('0')
-            total_hh = Decimal('0')
-            total_costo_hh = Decimal('0')
-            total_leasing = Decimal('0')
-            total_combustibles = Decimal('0')
-            total_reparaciones = Decimal('0')
-            total_seguros = Decimal('0')
-            total_honorarios = Decimal('0')
-            total_epp = Decimal('0')
-            total_peajes = Decimal('0')
-            total_remuneraciones = Decimal('0')
-            total_permisos = Decimal('0')
-            total_alimentacion = Decimal('0')
-            total_pasajes = Decimal('0')
-            total_correspondencia = Decimal('0')
-            total_gastos_legales = Decimal('0')
-            total_multas = Decimal('0')
-            total_otros = Decimal('0')
-            total_general = Decimal('0')
-
-            for mes, valores in datos_por_mes.items():
-                gastos = valores['gastos']
-                total_repuestos += gastos.get('repuestos', Decimal('0'))
-                total_hh += gastos.get('horas_hombre', Decimal('0'))
-                total_costo_hh += gastos.get('costo_hh', Decimal('0'))
-                total_leasing += gastos.get('leasing', Decimal('0'))
-                if incluir_gastos_operacionales:
-                    total_combustibles += gastos.get('combustibles', Decimal('0'))
-                    total_reparaciones += gastos.get('reparaciones', Decimal('0'))
-                    total_seguros += gastos.get('seguros', Decimal('0'))
-                    total_honorarios += gastos.get('honorarios', Decimal('0'))
-                    total_epp += gastos.get('epp', Decimal('0'))
-                    total_peajes += gastos.get('peajes', Decimal('0'))
-                    total_remuneraciones += gastos.get('remuneraciones', Decimal('0'))
-                    total_permisos += gastos.get('permisos', Decimal('0'))
-                    total_alimentacion += gastos.get('alimentacion', Decimal('0'))
-                    total_pasajes += gastos.get('pasajes', Decimal('0'))
-                    total_correspondencia += gastos.get('correspondencia', Decimal('0'))
-                    total_gastos_legales += gastos.get('gastos_legales', Decimal('0'))
-                    total_multas += gastos.get('multas', Decimal('0'))
-                    total_otros += gastos.get('otros_gastos', Decimal('0'))
-                total_general += self._get_total_gastos(gastos, incluir_gastos_operacionales)
-
-            totales_por_maquina.append((
-                maquina, total_repuestos, total_hh, total_costo_hh, total_leasing,
-                total_combustibles, total_reparaciones, total_seguros, total_honorarios,
-                total_epp, total_peajes, total_remuneraciones, total_permisos,
-                total_alimentacion, total_pasajes, total_correspondencia,
-                total_gastos_legales, total_multas, total_otros, total_general
-            ))
-
-        # Ordenar de mayor a menor por total_general (último elemento, índice 19)
-        totales_por_maquina.sort(key=lambda x: x[19], reverse=True)
-
-        # Generar filas en el orden correcto
-        for (maquina, total_repuestos, total_hh, total_costo_hh, total_leasing,
-              total_combustibles, total_reparaciones, total_seguros, total_honorarios,
-              total_epp, total_peajes, total_remuneraciones, total_permisos,
-              total_alimentacion, total_pasajes, total_correspondencia,
-              total_gastos_legales, total_multas, total_otros, total_general) in totales_por_maquina:
-
+        # Ordenar de mayor a menor por total de gastos
+        for maquina, t, total_general in sorted(gastos_trimestrales, key=itemgetter(2), reverse=True):
             if incluir_gastos_operacionales:
-                fila = f"""<tr data-maquina="{maquina}">
+                fila = f"""<tr{self._atributos_fila(maquina)}>
                     <td>{maquina}</td>
-                    <td>{self._formatear_moneda(total_repuestos)}</td>
-                    <td>{self._formatear_numero(total_hh, 0)}</td>
-                    <td>{self._formatear_moneda(total_costo_hh)}</td>
-                    <td>{self._formatear_moneda(total_leasing)}</td>
-                    <td>{self._formatear_moneda(total_combustibles)}</td>
-                    <td>{self._formatear_moneda(total_reparaciones)}</td>
-                    <td>{self._formatear_moneda(total_seguros)}</td>
-                    <td>{self._formatear_moneda(total_honorarios)}</td>
-                    <td>{self._formatear_moneda(total_epp)}</td>
-                    <td>{self._formatear_moneda(total_peajes)}</td>
-                    <td>{self._formatear_moneda(total_remuneraciones)}</td>
-                    <td>{self._formatear_moneda(total_permisos)}</td>
-                    <td>{self._formatear_moneda(total_alimentacion)}</td>
-                    <td>{self._formatear_moneda(total_pasajes)}</td>
-                    <td>{self._formatear_moneda(total_correspondencia)}</td>
-                    <td>{self._formatear_moneda(total_gastos_legales)}</td>
-                    <td>{self._formatear_moneda(total_multas)}</td>
-                    <td>{self._formatear_moneda(total_otros)}</td>
+                    <td>{self._formatear_moneda(t['repuestos'])}</td>
+                    <td>{self._formatear_numero(t['horas_hombre'], 0)}</td>
+                    <td>{self._formatear_moneda(t['costo_hh'])}</td>
+                    <td>{self._formatear_moneda(t['leasing'])}</td>
+                    <td>{self._formatear_moneda(t['combustibles'])}</td>
+                    <td>{self._formatear_moneda(t['reparaciones'])}</td>
+                    <td>{self._formatear_moneda(t['seguros'])}</td>
+                    <td>{self._formatear_moneda(t['honorarios'])}</td>
+                    <td>{self._formatear_moneda(t['epp'])}</td>
+                    <td>{self._formatear_moneda(t['peajes'])}</td>
+                    <td>{self._formatear_moneda(t['remuneraciones'])}</td>
+                    <td>{self._formatear_moneda(t['permisos'])}</td>
+                    <td>{self._formatear_moneda(t['alimentacion'])}</td>
+                    <td>{self._formatear_moneda(t['pasajes'])}</td>
+                    <td>{self._formatear_moneda(t['correspondencia'])}</td>
+                    <td>{self._formatear_moneda(t['gastos_legales'])}</td>
+                    <td>{self._formatear_moneda(t['multas'])}</td>
+                    <td>{self._formatear_moneda(t['otros_gastos'])}</td>
                     <td><strong>{self._formatear_moneda(total_general)}</strong></td>
                 </tr>"""
             else:
-                fila = f"""<tr data-maquina="{maquina}">
+                fila = f"""<tr{self._atributos_fila(maquina)}>
                     <td>{maquina}</td>
-                    <td>{self._formatear_moneda(total_repuestos)}</td>
-                    <td>{self._formatear_numero(total_hh, 0)}</td>
-                    <td>{self._formatear_moneda(total_costo_hh)}</td>
-                    <td>{self._formatear_moneda(total_leasing)}</td>
+                    <td>{self._formatear_moneda(t['repuestos'])}</td>
+                    <td>{self._formatear_numero(t['horas_hombre'], 0)}</td>
+                    <td>{self._formatear_moneda(t['costo_hh'])}</td>
+                    <td>{self._formatear_moneda(t['leasing'])}</td>
                     <td>{self._formatear_moneda(total_general)}</td>
                 </tr>"""
             filas.append(fila)
 
         return '\n'.join(filas)
 
-    def _generar_filas_gastos(self, datos_por_maquina: Dict[str, Dict[int, Dict]], incluir_gastos_operacionales: bool) -> str:
-        """Genera las filas de la tabla de gastos (todas juntas - método obsoleto, mantener por compatibilidad)."""
-        filas = []
-
-        for maquina, datos_por_mes in datos_por_maquina.items():
-            for mes, valores in datos_por_mes.items():
-                gastos = valores['gastos']
-                total_gastos = self._get_total_gastos(gastos, incluir_gastos_operacionales)
-                
-                if incluir_gastos_operacionales:
-                    # Tabla completa con gastos operacionales desglosados
-                    fila = f"""<tr data-maquina="{maquina}" data-mes="{mes}">
-                        <td>{maquina}</td>
-                        <td>{self.MESES[int(mes)]}</td>
-                        <td>{self._formatear_moneda(gastos.get('repuestos', Decimal('0')))}</td>
-                        <td>{self._formatear_numero(gastos.get('horas_hombre', Decimal('0')), 0)}</td>
-                        <td>{self._formatear_moneda(gastos.get('costo_hh', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('leasing', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('combustibles', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('reparaciones', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('seguros', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('honorarios', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('epp', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('peajes', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('remuneraciones', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('permisos', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('alimentacion', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('pasajes', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('correspondencia', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('gastos_legales', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('multas', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('otros_gastos', Decimal('0')))}</td>
-                        <td><strong>{self._formatear_moneda(total_gastos)}</strong></td>
-                    </tr>"""
-                else:
-                    # Tabla simple sin gastos operacionales
-                    fila = f"""<tr data-maquina="{maquina}" data-mes="{mes}">
-                        <td>{maquina}</td>
-                        <td>{self.MESES[int(mes)]}</td>
-                        <td>{self._formatear_moneda(gastos.get('repuestos', Decimal('0')))}</td>
-                        <td>{self._formatear_numero(gastos.get('horas_hombre', Decimal('0')), 0)}</td>
-                        <td>{self._formatear_moneda(gastos.get('costo_hh', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(gastos.get('leasing', Decimal('0')))}</td>
-                        <td>{self._formatear_moneda(total_gastos)}</td>
-                    </tr>"""
-                filas.append(fila)
-        
-        return '\n'.join(filas)
-    
-    def _generar_datos_graficos(self, datos_por_maquina: Dict[str, Dict[int, Dict]], incluir_gastos_operacionales: bool) -> str:
-        """Genera el código JavaScript para los gráficos."""
-        
-        # Calcular datos por mes para gráficos
-        gastos_por_mes = {10: 0.0, 11: 0.0, 12: 0.0}
-        repuestos_por_mes = {10: 0.0, 11: 0.0, 12: 0.0}
-        costo_hh_por_mes = {10: 0.0, 11: 0.0, 12: 0.0}
-        leasing_por_mes = {10: 0.0, 11: 0.0, 12: 0.0}
-        
-        valor_mt3_por_mes = {10: 0.0, 11: 0.0, 12: 0.0}
-        valor_horas_por_mes = {10: 0.0, 11: 0.0, 12: 0.0}
-        valor_km_por_mes = {10: 0.0, 11: 0.0, 12: 0.0}
-        
-        for datos_por_mes in datos_por_maquina.values():
-            for mes, valores in datos_por_mes.items():
-                gastos = valores['gastos']
-                prod = valores['produccion']
-                
-                gastos_por_mes[mes] += float(gastos.get('total', 0))
-                repuestos_por_mes[mes] += float(gastos.get('repuestos', 0))
-                costo_hh_por_mes[mes] += float(gastos.get('costo_hh', 0))
-                leasing_por_mes[mes] += float(gastos.get('leasing', 0))
-                
-                valor_mt3_por_mes[mes] += float(prod.get('valor_mt3', 0))
-                valor_horas_por_mes[mes] += float(prod.get('valor_horas', 0))
-                valor_km_por_mes[mes] += float(prod.get('valor_km', 0))
-        
-        # Generar código JavaScript
-        js = f"""
-        const gastosPorMes = {json.dumps(gastos_por_mes)};
-        const repuestosPorMes = {json.dumps(repuestos_por_mes)};
-        const costoHHPorMes = {json.dumps(costo_hh_por_mes)};
-        const leasingPorMes = {json.dumps(leasing_por_mes)};
-        
-        const valorMT3PorMes = {json.dumps(valor_mt3_por_mes)};
-        const valorHorasPorMes = {json.dumps(valor_horas_por_mes)};
-        const valorKmPorMes = {json.dumps(valor_km_por_mes)};
-        
-        const ctxGastos = document.getElementById('chartGastos').getContext('2d');
-        new Chart(ctxGastos, {{
-            type: 'bar',
-            data: {{
-                labels: meses,
-                datasets: [
-                    {{
-                        label: 'Repuestos',
-                        data: meses.map(m => repuestosPorMes[m] || 0),
-                        backgroundColor: 'rgba(255, 99, 132, 0.6)'
-                    }},
-                    {{
-                        label: 'Costo Horas Hombre',
-                        data: meses.map(m => costoHHPorMes[m] || 0),
-                        backgroundColor: 'rgba(54, 162, 235, 0.6)'
-                    }},
-                    {{
-                        label: 'Leasing',
-                        data: meses.map(m => leasingPorMes[m] || 0),
-                        backgroundColor: 'rgba(255, 206, 86, 0.6)'
-                    }}
-                ]
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: false,
-                plugins: {{
-                    title: {{
-                        display: true,
-                        text: 'Gastos por Mes (CLP)'
-                    }},
-                    legend: {{
-                        display: true
-                    }}
-                }},
-                scales: {{
-                    y: {{
-                        beginAtZero: true,
-                        ticks: {{
-                            callback: function(value) {{
-                                return '$' + value.toLocaleString('es-CL');
-                            }}
-                        }}
-                    }}
-                }}
-            }}
-        }});
-        
-        const ctxProduccion = document.getElementById('chartProduccion').getContext('2d');
-        
-        const datasets = [];
-        
-        if (Object.values(valorMT3PorMes).some(v => v > 0)) {{
-            datasets.push({{
-                label: 'MT3 ($)',
-                data: meses.map(m => valorMT3PorMes[m] || 0),
-                borderColor: 'rgba(75, 192, 192, 1)',
-                backgroundColor: 'rgba(75, 192, 192, 0.2)',
-                yAxisID: 'y'
-            }});
-        }}
-        
-        if (Object.values(valorHorasPorMes).some(v => v > 0)) {{
-            datasets.push({{
-                label: 'Horas ($)',
-                data: meses.map(m => valorHorasPorMes[m] || 0),
-                borderColor: 'rgba(153, 102, 255, 1)',
-                backgroundColor: 'rgba(153, 102, 255, 0.2)',
-                yAxisID: 'y'
-            }});
-        }}
-        
-        if (Object.values(valorKmPorMes).some(v => v > 0)) {{
-            datasets.push({{
-                label: 'Km ($)',
-                data: meses.map(m => valorKmPorMes[m] || 0),
-                borderColor: 'rgba(255, 99, 132, 1)',
-                backgroundColor: 'rgba(255, 99, 132, 0.2)',
-                yAxisID: 'y'
-            }});
-        }}
-        
-        new Chart(ctxProduccion, {{
-            type: 'line',
-            data: {{
-                labels: meses,
-                datasets: datasets
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: false,
-                plugins: {{
-                    title: {{
-                        display: true,
-                        text: 'Producción por Mes (Valores Monetarios)'
-                    }}
-                }},
-                scales: {{
-                    y: {{
-                        type: 'linear',
-                        display: true,
-                        position: 'left',
-                        beginAtZero: true,
-                        title: {{
-                            display: true,
-                            text: 'Valor ($ CLP)'
-                        }},
-                        ticks: {{
-                            callback: function(value) {{
-                                return '$' + value.toLocaleString('es-CL');
-                            }}
-                        }}
-                    }}
-                }}
-            }}
-        }});
-"""
-        return js
-    
     def _get_clase_prod_real(self, valor: Decimal) -> str:
         """Obtiene la clase CSS para el valor de producción real."""
-        if valor > 0:
-            return 'positive'
-        elif valor < 0:
-            return 'negative'
-        else:
-            return ''
-    
-    def _generar_tabla_gastos_mensual(self, datos_por_mes: Dict[int, List[Tuple[str, Dict]]], incluir_gastos_operacionales: bool) -> str:
-        """Genera una tabla HTML estática con el resumen de gastos por mes."""
-        
-        # Inicializar totales por mes con todos los campos necesarios
-        totales_por_mes = {}
-        for mes in [10, 11, 12]:
-            totales_por_mes[mes] = {
-                'repuestos': Decimal('0'),
-                'horas_hombre': Decimal('0'),
-                'costo_hh': Decimal('0'),
-                'leasing': Decimal('0'),
-                'combustibles': Decimal('0'),
-                'reparaciones': Decimal('0'),
-                'seguros': Decimal('0'),
-                'honorarios': Decimal('0'),
-                'epp': Decimal('0'),
-                'peajes': Decimal('0'),
-                'remuneraciones': Decimal('0'),
-                'permisos': Decimal('0'),
-                'alimentacion': Decimal('0'),
-                'pasajes': Decimal('0'),
-                'correspondencia': Decimal('0'),
-                'gastos_legales': Decimal('0'),
-                'multas': Decimal('0'),
-                'otros_gastos': Decimal('0'),
-                'total': Decimal('0')
-            }
-        
-        # Sumar datos reales de cada máquina por mes
-        for mes, datos in datos_por_mes.items():
-            for maquina, valores in datos:
-                gastos = valores['gastos']
-                totales_por_mes[mes]['repuestos'] += gastos.get('repuestos', Decimal('0'))
-                totales_por_mes[mes]['horas_hombre'] += gastos.get('horas_hombre', Decimal('0'))
-                totales_por_mes[mes]['costo_hh'] += gastos.get('costo_hh', Decimal('0'))
-                totales_por_mes[mes]['leasing'] += gastos.get('leasing', Decimal('0'))
-                
-                if incluir_gastos_operacionales:
-                    totales_por_mes[mes]['combustibles'] += gastos.get('combustibles', Decimal('0'))
-                    totales_por_mes[mes]['reparaciones'] += gastos.get('reparaciones', Decimal('0'))
-                    totales_por_mes[mes]['seguros'] += gastos.get('seguros', Decimal('0'))
-                    totales_por_mes[mes]['honorarios'] += gastos.get('honorarios', Decimal('0'))
-                    totales_por_mes[mes]['epp'] += gastos.get('epp', Decimal('0'))
-                    totales_por_mes[mes]['peajes'] += gastos.get('peajes', Decimal('0'))
-                    totales_por_mes[mes]['remuneraciones'] += gastos.get('remuneraciones', Decimal('0'))
-                    totales_por_mes[mes]['permisos'] += gastos.get('permisos', Decimal('0'))
-                    totales_por_mes[mes]['alimentacion'] += gastos.get('alimentacion', Decimal('0'))
-                    totales_por_mes[mes]['pasajes'] += gastos.get('pasajes', Decimal('0'))
-                    totales_por_mes[mes]['correspondencia'] += gastos.get('correspondencia', Decimal('0'))
-                    totales_por_mes[mes]['gastos_legales'] += gastos.get('gastos_legales', Decimal('0'))
-                    totales_por_mes[mes]['multas'] += gastos.get('multas', Decimal('0'))
-                    totales_por_mes[mes]['otros_gastos'] += gastos.get('otros_gastos', Decimal('0'))
-                
-                totales_por_mes[mes]['total'] += self._get_total_gastos(gastos, incluir_gastos_operacionales)
-        
-        # Generar filas de la tabla
-        filas = []
-        for mes in [10, 11, 12]:
-            totales = totales_por_mes[mes]
-            
-            if incluir_gastos_operacionales:
-                # Tabla completa con gastos operacionales
-                fila = f"""<tr>
-                    <td>{self.MESES[mes]}</td>
-                    <td>{self._formatear_moneda(totales['repuestos'])}</td>
-                    <td>{self._formatear_numero(totales['horas_hombre'], 0)}</td>
-                    <td>{self._formatear_moneda(totales['costo_hh'])}</td>
-                    <td>{self._formatear_moneda(totales['leasing'])}</td>
-                    <td>{self._formatear_moneda(totales['combustibles'])}</td>
-                    <td>{self._formatear_moneda(totales['reparaciones'])}</td>
-                    <td>{self._formatear_moneda(totales['seguros'])}</td>
-                    <td>{self._formatear_moneda(totales['honorarios'])}</td>
-                    <td>{self._formatear_moneda(totales['epp'])}</td>
-                    <td>{self._formatear_moneda(totales['peajes'])}</td>
-                    <td>{self._formatear_moneda(totales['remuneraciones'])}</td>
-                    <td>{self._formatear_moneda(totales['permisos'])}</td>
-                    <td>{self._formatear_moneda(totales['alimentacion'])}</td>
-                    <td>{self._formatear_moneda(totales['pasajes'])}</td>
-                    <td>{self._formatear_moneda(totales['correspondencia'])}</td>
-                    <td>{self._formatear_moneda(totales['gastos_legales'])}</td>
-                    <td>{self._formatear_moneda(totales['multas'])}</td>
-                    <td>{self._formatear_moneda(totales['otros_gastos'])}</td>
-                    <td><strong>{self._formatear_moneda(totales['total'])}</strong></td>
-                </tr>"""
-            else:
-                # Tabla simple
-                fila = f"""<tr>
-                    <td>{self.MESES[mes]}</td>
-                    <td>{self._formatear_moneda(totales['repuestos'])}</td>
-                    <td>{self._formatear_numero(totales['horas_hombre'], 0)}</td>
-                    <td>{self._formatear_moneda(totales['costo_hh'])}</td>
-                    <td>{self._formatear_moneda(totales['leasing'])}</td>
-                    <td>{self._formatear_moneda(totales['total'])}</td>
-                </tr>"""
-            filas.append(fila)
-        
-        # Generar headers según el modo
-        if incluir_gastos_operacionales:
-            headers = """<tr>
-                    <th>Mes</th>
-                    <th>Repuestos</th>
-                    <th>Horas HH</th>
-                    <th>Costo HH</th>
-                    <th>Leasing</th>
-                    <th>Combustibles</th>
-                    <th>Reparaciones</th>
-                    <th>Seguros</th>
-                    <th>Honorarios</th>
-                    <th>EPP</th>
-                    <th>Peajes</th>
-                    <th>Remuneraciones</th>
-                    <th>Permisos</th>
-                    <th>Alimentación</th>
-                    <th>Pasajes</th>
-                    <th>Correspondencia</th>
-                    <th>Gastos Legales</th>
-                    <th>Multas</th>
-                    <th>Otros</th>
-                    <th>Total Gastos</th>
-                </tr>"""
-        else:
-            headers = """<tr>
-                    <th>Mes</th>
-                    <th>Repuestos</th>
-                    <th>Horas Hombre</th>
-                    <th>Costo HH</th>
-                    <th>Leasing</th>
-                    <th>Total Gastos</th>
-                </tr>"""
-        
-        tabla = f"""<table style="margin-top: 20px;">
-            <thead>
-                {headers}
-            </thead>
-            <tbody>
-                {''.join(filas)}
-            </tbody>
-        </table>"""
-        
-        return tabla
\ No newline at end of file
+        # Índice por signo: 0 negativo, 1 cero, 2 positivo
+        return self.CLASES_PROD_REAL[(valor > 0) - (valor < 0) + 1]
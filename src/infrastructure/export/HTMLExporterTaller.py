@@ -6,302 +6,124 @@ El taller no tiene producción, solo control de gastos.
 """
 
 from decimal import Decimal
+from datetime import date
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Iterator, NamedTuple, Tuple
 from collections import defaultdict
-import json
+from string import Template
+from operator import attrgetter, itemgetter
+from html import escape
+import math
+import re
 
 from src.domain.entities.GastoOperacional import GastoOperacional, TipoGasto
 from src.domain.entities.Repuesto import Repuesto
 from src.domain.entities.HorasHombre import HorasHombre
-
-
-class HTMLExporterTaller:
-    """
-    Exporta los datos de gastos de TALLER a un archivo HTML.
-    
-    Crea un dashboard con:
-    - Resumen de gastos totales
-    - Desglose por categoría de gasto
-    - Detalle mensual
-    - Identificación de gastos imputables a máquinas
-    """
-    
-    MESES = {
-        1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril',
-        5: 'Mayo', 6: 'Junio', 7: 'Julio', 8: 'Agosto',
-        9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
-    }
-    
-    def __init__(self, ruta_salida: str):
-        """
-        Inicializa el exportador.
-        
-        Args:
-            ruta_salida: Ruta donde se guardará el archivo HTML
-        """
-        self.ruta_salida = Path(ruta_salida)
-    
-    def _formatear_moneda(self, valor: Decimal) -> str:
-        """Formatea un valor como moneda chilena."""
-        return f"${valor:,.0f}".replace(',', '.')
-    
-    def _formatear_numero(self, valor: Decimal, decimales: int = 2) -> str:
-        """Formatea un número con decimales."""
-        return f"{valor:,.{decimales}f}".replace(',', '.')
-    
-    def _get_clase_valor(self, valor: Decimal) -> str:
-        """Obtiene la clase CSS para un valor."""
-        if valor > 0:
-            return 'negative'  # Gastos son negativos para el negocio
-        return ''
-    
-    def exportar(
-        self,
-        gastos_taller: List[GastoOperacional],
-        repuestos_taller: Optional[List[Repuesto]] = None,
-        horas_hombre_taller: Optional[List[HorasHombre]] = None
-    ):
-        """
-        Exporta los gastos de taller a HTML.
-
-        Args:
-            gastos_taller: Lista de gastos operacionales de taller
-            repuestos_taller: Lista de repuestos usados en taller (opcional)
-            horas_hombre_taller: Lista de horas hombre de taller (opcional)
-        """
-        # Calcular datos agregados
-        datos = self._calcular_datos(
-            gastos_taller,
-            repuestos_taller or [],
-            horas_hombre_taller or []
-        )
-
-        # Generar HTML
-        html = self._generar_html(datos, gastos_taller)
-
-        # Guardar archivo
-        with open(self.ruta_salida, 'w', encoding='utf-8') as f:
-            f.write(html)
-    
-    def _calcular_datos(
-        self,
-        gastos: List[GastoOperacional],
-        repuestos: List[Repuesto],
-        horas_hombre: List[HorasHombre]
-    ) -> Dict:
-        """Calcula los datos agregados para el informe."""
-        
-        # Totales generales
-        total_gastos_op = Decimal('0')
-        total_repuestos = Decimal('0')
-        total_horas_hombre = Decimal('0')
-        total_costo_hh = Decimal('0')
-        
-        # Por mes
-        gastos_por_mes: Dict[int, Dict[str, Decimal]] = defaultdict(lambda: {
-            'repuestos': Decimal('0'),
-            'horas_hombre': Decimal('0'),
-            'costo_hh': Decimal('0'),
-            'combustibles': Decimal('0'),
-            'reparaciones': Decimal('0'),
-            'seguros': Decimal('0'),
-            'honorarios': Decimal('0'),
-            'epp': Decimal('0'),
-            'peajes': Decimal('0'),
-            'remuneraciones': Decimal('0'),
-            'permisos': Decimal('0'),
-            'alimentacion': Decimal('0'),
-            'pasajes': Decimal('0'),
-            'correspondencia': Decimal('0'),
-            'gastos_legales': Decimal('0'),
-            'multas': Decimal('0'),
-            'otros_gastos': Decimal('0'),
-            'total': Decimal('0')
-        })
-        
-        # Por categoría
-        gastos_por_categoria: Dict[str, Decimal] = defaultdict(Decimal)
-        
-        # Gastos con comentarios que mencionan máquinas (potencialmente imputables)
-        gastos_imputables: List[Dict] = []
-        
-        COSTO_HORA = Decimal('35000')
-        
-        # Procesar gastos operacionales
-        for gasto in gastos:
-            if gasto.es_ingreso:
-                continue
-            
-            mes = gasto.mes
-            total_gastos_op += gasto.monto
-            
-            # Clasificar por tipo
-            nombre_tipo = gasto.nombre_tipo_gasto
-            gastos_por_categoria[nombre_tipo] += gasto.monto
-            
-            # Clasificar por mes y tipo
-            if gasto.tipo_gasto == TipoGasto.COMBUSTIBLES.value:
-                gastos_por_mes[mes]['combustibles'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.REPARACIONES.value:
-                gastos_por_mes[mes]['reparaciones'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.SEGUROS.value:
-                gastos_por_mes[mes]['seguros'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.HONORARIOS.value:
-                gastos_por_mes[mes]['honorarios'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.EPP.value:
-                gastos_por_mes[mes]['epp'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.PEAJES.value:
-                gastos_por_mes[mes]['peajes'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.REMUNERACIONES.value:
-                gastos_por_mes[mes]['remuneraciones'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.PERMISOS.value:
-                gastos_por_mes[mes]['permisos'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.ALIMENTACION.value:
-                gastos_por_mes[mes]['alimentacion'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.PASAJES.value:
-                gastos_por_mes[mes]['pasajes'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.CORRESPONDENCIA.value:
-                gastos_por_mes[mes]['correspondencia'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.GASTOS_LEGALES.value:
-                gastos_por_mes[mes]['gastos_legales'] += gasto.monto
-            elif gasto.tipo_gasto == TipoGasto.MULTAS.value:
-                gastos_por_mes[mes]['multas'] += gasto.monto
-            else:
-                gastos_por_mes[mes]['otros_gastos'] += gasto.monto
-            
-            gastos_por_mes[mes]['total'] += gasto.monto
-            
-            # Detectar gastos potencialmente imputables (glosa menciona código de máquina)
-            glosa_upper = gasto.glosa.upper()
-            # Patrones comunes de códigos de máquina: CT-XX, EX-XX, RX-XX, etc.
-            import re
-            patron_maquina = re.compile(r'[A-Z]{2,3}-\d{1,2}')
-            match = patron_maquina.search(glosa_upper)
-            if match:
-                gastos_imputables.append({
-                    'fecha': gasto.fecha,
-                    'mes': mes,
-                    'tipo': nombre_tipo,
-                    'glosa': gasto.glosa,
-                    'monto': gasto.monto,
-                    'maquina_detectada': match.group(0),
-                    'origen': gasto.origen
-                })
-        
-        # Procesar repuestos de taller
-        for repuesto in repuestos:
-            mes = repuesto.fecha_salida.month
-            total_repuestos += repuesto.total
-            gastos_por_mes[mes]['repuestos'] += repuesto.total
-            gastos_por_mes[mes]['total'] += repuesto.total
-            gastos_por_categoria['Repuestos'] += repuesto.total
-        
-        # Procesar horas hombre de taller
-        for hh in horas_hombre:
-            mes = hh.fecha.month
-            costo = hh.horas * COSTO_HORA
-            total_horas_hombre += hh.horas
-            total_costo_hh += costo
-            gastos_por_mes[mes]['horas_hombre'] += hh.horas
-            gastos_por_mes[mes]['costo_hh'] += costo
-            gastos_por_mes[mes]['total'] += costo
-            gastos_por_categoria['Horas Hombre'] += costo
-        
-        # Total general
-        total_general = total_gastos_op + total_repuestos + total_costo_hh
-        
-        return {
-            'total_general': total_general,
-            'total_gastos_op': total_gastos_op,
-            'total_repuestos': total_repuestos,
-            'total_horas_hombre': total_horas_hombre,
-            'total_costo_hh': total_costo_hh,
-            'gastos_por_mes': dict(gastos_por_mes),
-            'gastos_por_categoria': dict(gastos_por_categoria),
-            'gastos_imputables': gastos_imputables,
-            'cantidad_gastos': len(gastos),
-            'cantidad_imputables': len(gastos_imputables)
-        }
-    
-    def _generar_html(self, datos: Dict, gastos: List[GastoOperacional]) -> str:
-        """Genera el contenido HTML completo."""
-
-        # Generar filas de tablas por mes (para sub-tabs)
-        filas_resumen_oct = self._generar_filas_resumen_mensual_por_mes(datos['gastos_por_mes'], 10)
-        filas_resumen_nov = self._generar_filas_resumen_mensual_por_mes(datos['gastos_por_mes'], 11)
-        filas_resumen_dic = self._generar_filas_resumen_mensual_por_mes(datos['gastos_por_mes'], 12)
-        filas_resumen_trimestral = self._generar_filas_resumen_trimestral_ordenado(datos['gastos_por_mes'])
-
-        # Generar filas de gastos imputables por mes (para sub-tabs)
-        filas_imputables_oct = self._generar_filas_imputables_por_mes(datos['gastos_imputables'], 10)
-        filas_imputables_nov = self._generar_filas_imputables_por_mes(datos['gastos_imputables'], 11)
-        filas_imputables_dic = self._generar_filas_imputables_por_mes(datos['gastos_imputables'], 12)
-        filas_imputables_trimestral = self._generar_filas_imputables_ordenado(datos['gastos_imputables'])
-
-        filas_detalle = self._generar_filas_detalle(gastos)
-        
-        # Datos para gráficos
-        datos_grafico_categorias = json.dumps({
-            k: float(v) for k, v in datos['gastos_por_categoria'].items()
-        })
-        
-        datos_grafico_meses = {}
-        for mes, valores in datos['gastos_por_mes'].items():
-            datos_grafico_meses[self.MESES[mes]] = float(valores['total'])
-        datos_grafico_meses_json = json.dumps(datos_grafico_meses)
-        
-        # Calcular porcentaje de imputables
-        porcentaje_imputables = Decimal('0')
-        total_imputables = sum(g['monto'] for g in datos['gastos_imputables'])
-        if datos['total_general'] > 0:
-            porcentaje_imputables = (total_imputables / datos['total_general']) * 100
-        
-        html = f"""<!DOCTYPE html>
+from src.infrastructure.export.formato import formatear_moneda, formatear_numero
+from src.infrastructure.export.salida import escribir_partes
+
+
+class GastoImputable(NamedTuple):
+    """Gasto cuya glosa menciona un código de máquina (fila compacta, sin diccionario)."""
+    fecha: date
+    mes: int
+    tipo: str
+    glosa: str
+    monto: Decimal
+    maquina_detectada: str
+    origen: str
+
+
+class AgregadosCategorias(NamedTuple):
+    """Montos por categoría del resumen, calculados una vez para todas las tablas mensuales y la trimestral."""
+    categorias: Tuple[str, ...]
+    montos_por_mes: Dict[int, List[Decimal]]
+    totales_mes: Dict[int, Decimal]
+    total_por_categoria: List[Decimal]
+
+
+# Patrones comunes de códigos de máquina: CT-XX, EX-XX, RX-XX, etc.
+_PATRON_MAQUINA = re.compile(r'[A-Z]{2,3}-\d{1,2}')
+
+_ZERO = Decimal('0')
+
+
+def _colores_categorias(cantidad: int) -> List[str]:
+    """Un color HSL por categoría, repartidos en el círculo cromático (nunca se repiten)."""
+    return [f'hsl({int(i * 360 / cantidad + 0.5)}, 65%, 50%)' for i in range(cantidad)]
+
+
+# Claves del desglose mensual; Decimal es inmutable, así que todas parten del mismo cero
+_CLAVES_GASTOS_MES = (
+    'repuestos', 'horas_hombre', 'costo_hh', 'combustibles', 'reparaciones',
+    'seguros', 'honorarios', 'epp', 'peajes', 'remuneraciones', 'permisos',
+    'alimentacion', 'pasajes', 'correspondencia', 'gastos_legales', 'multas',
+    'otros_gastos', 'total'
+)
+
+# Categorías de los resúmenes mensual y trimestral, con su clave en el desglose mensual
+_CATEGORIAS_RESUMEN = (
+    ('Repuestos', 'repuestos'), ('Horas Hombre', 'costo_hh'),
+    ('Combustibles', 'combustibles'), ('Reparaciones', 'reparaciones'),
+    ('Seguros', 'seguros'), ('Honorarios', 'honorarios'), ('EPP', 'epp'),
+    ('Peajes', 'peajes'), ('Remuneraciones', 'remuneraciones'),
+    ('Permisos', 'permisos'), ('Alimentación', 'alimentacion'),
+    ('Pasajes', 'pasajes'), ('Correspondencia', 'correspondencia'),
+    ('Gastos Legales', 'gastos_legales'), ('Multas', 'multas'),
+    ('Otros Gastos', 'otros_gastos')
+)
+_ETIQUETAS_RESUMEN = tuple(etiqueta for etiqueta, _ in _CATEGORIAS_RESUMEN)
+# Cada desglose mensual trae todas las claves (se crea con _CLAVES_GASTOS_MES):
+# los montos se leen en el orden de _CATEGORIAS_RESUMEN con un único itemgetter
+_MONTOS_RESUMEN = itemgetter(*(clave for _, clave in _CATEGORIAS_RESUMEN))
+_CEROS_RESUMEN = (_ZERO,) * len(_CATEGORIAS_RESUMEN)
+
+
+# Partes estáticas del documento (sin interpolación): se escriben tal cual en cada exportación
+_CABECERA_HTML = """<!DOCTYPE html>
 <html lang="es">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Informe de Gastos TALLER - Q4 2025</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
     <style>
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: linear-gradient(135deg, #e74c3c 0%, #c0392b 100%);
             padding: 20px;
             min-height: 100vh;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
             background: white;
             border-radius: 10px;
             box-shadow: 0 10px 40px rgba(0,0,0,0.2);
             padding: 30px;
-        }}
+        }
         
-        h1 {{
+        h1 {
             color: #333;
             text-align: center;
             margin-bottom: 10px;
             font-size: 2.2em;
-        }}
+        }
         
-        .subtitle {{
+        .subtitle {
             text-align: center;
             color: #666;
             margin-bottom: 30px;
             font-size: 1.1em;
-        }}
+        }
         
-        .alerta {{
+        .alerta {
             background: #fff3cd;
             border: 1px solid #ffeaa7;
             color: #856404;
@@ -309,9 +131,9 @@ class HTMLExporterTaller:
             border-radius: 5px;
             margin-bottom: 20px;
             text-align: center;
-        }}
+        }
         
-        .alerta-importante {{
+        .alerta-importante {
             background: #f8d7da;
             border: 1px solid #f5c6cb;
             color: #721c24;
@@ -320,99 +142,99 @@ class HTMLExporterTaller:
             margin-bottom: 20px;
             text-align: center;
             font-weight: bold;
-        }}
+        }
         
-        .summary-cards {{
+        .summary-cards {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
             gap: 15px;
             margin-bottom: 30px;
-        }}
+        }
         
-        .card {{
+        .card {
             background: linear-gradient(135deg, #e74c3c 0%, #c0392b 100%);
             color: white;
             padding: 15px;
             border-radius: 8px;
             box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .card.repuestos {{
+        .card.repuestos {
             background: linear-gradient(135deg, #3498db 0%, #2980b9 100%);
-        }}
+        }
         
-        .card.horas {{
+        .card.horas {
             background: linear-gradient(135deg, #9b59b6 0%, #8e44ad 100%);
-        }}
+        }
         
-        .card.operacionales {{
+        .card.operacionales {
             background: linear-gradient(135deg, #e67e22 0%, #d35400 100%);
-        }}
+        }
         
-        .card.imputables {{
+        .card.imputables {
             background: linear-gradient(135deg, #27ae60 0%, #219a52 100%);
-        }}
+        }
         
-        .card h3 {{
+        .card h3 {
             font-size: 0.85em;
             opacity: 0.9;
             margin-bottom: 8px;
-        }}
+        }
         
-        .card .value {{
+        .card .value {
             font-size: 1.4em;
             font-weight: bold;
-        }}
+        }
         
-        .card .detail {{
+        .card .detail {
             font-size: 0.75em;
             opacity: 0.8;
             margin-top: 5px;
-        }}
+        }
         
-        .section {{
+        .section {
             margin-bottom: 40px;
-        }}
+        }
         
-        .section h2 {{
+        .section h2 {
             color: #c0392b;
             margin-bottom: 20px;
             padding-bottom: 10px;
             border-bottom: 3px solid #e74c3c;
-        }}
+        }
         
-        .chart-container {{
+        .chart-container {
             position: relative;
             height: 350px;
             margin-bottom: 30px;
             background: #f8f9fa;
             padding: 15px;
             border-radius: 8px;
-        }}
+        }
         
-        .charts-grid {{
+        .charts-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
             gap: 20px;
             margin-bottom: 30px;
-        }}
+        }
         
-        table {{
+        table {
             width: 100%;
             border-collapse: collapse;
             margin-top: 20px;
             background: white;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .table-responsive {{
+        .table-responsive {
             width: 100%;
             overflow-x: auto;
             -webkit-overflow-scrolling: touch;
             margin-bottom: 20px;
-        }}
+        }
         
-        th {{
+        th {
             background: #e74c3c;
             color: white;
             padding: 12px 10px;
@@ -420,47 +242,47 @@ class HTMLExporterTaller:
             font-weight: 600;
             white-space: nowrap;
             font-size: 0.85em;
-        }}
+        }
         
-        th.imputables {{
+        th.imputables {
             background: #27ae60;
-        }}
+        }
         
-        td {{
+        td {
             padding: 10px;
             border-bottom: 1px solid #eee;
             font-size: 0.9em;
-        }}
+        }
         
-        tr:hover {{
+        tr:hover {
             background: #f8f9fa;
-        }}
+        }
         
-        .negative {{
+        .negative {
             color: #e74c3c;
             font-weight: bold;
-        }}
+        }
         
-        .positive {{
+        .positive {
             color: #27ae60;
             font-weight: bold;
-        }}
+        }
         
-        .imputable-row {{
+        .imputable-row {
             background: #e8f5e9;
             border-left: 4px solid #27ae60;
-        }}
+        }
         
-        .tabs {{
+        .tabs {
             display: flex;
             gap: 10px;
             margin-bottom: 20px;
             border-bottom: 2px solid #e74c3c;
             padding-bottom: 10px;
             flex-wrap: wrap;
-        }}
+        }
         
-        .tab {{
+        .tab {
             padding: 10px 20px;
             background: #f0f0f0;
             border: none;
@@ -469,34 +291,34 @@ class HTMLExporterTaller:
             font-size: 1em;
             font-weight: 600;
             transition: all 0.3s ease;
-        }}
+        }
         
-        .tab:hover {{
+        .tab:hover {
             background: #e0e0e0;
-        }}
+        }
         
-        .tab.active {{
+        .tab.active {
             background: #e74c3c;
             color: white;
-        }}
+        }
         
-        .sub-tab-content {{
+        .sub-tab-content {
             display: none;
-        }}
+        }
 
-        .sub-tab-content.active {{
+        .sub-tab-content.active {
             display: block;
-        }}
+        }
 
-        .tab-content {{
+        .tab-content {
             display: none;
-        }}
+        }
         
-        .tab-content.active {{
+        .tab-content.active {
             display: block;
-        }}
+        }
         
-        .comentario {{
+        .comentario {
             font-style: italic;
             color: #666;
             font-size: 0.85em;
@@ -504,16 +326,16 @@ class HTMLExporterTaller:
             overflow: hidden;
             text-overflow: ellipsis;
             white-space: nowrap;
-        }}
+        }
         
-        .maquina-badge {{
+        .maquina-badge {
             background: #27ae60;
             color: white;
             padding: 2px 8px;
             border-radius: 12px;
             font-size: 0.8em;
             font-weight: bold;
-        }}
+        }
     </style>
 </head>
 <body>
@@ -525,60 +347,66 @@ class HTMLExporterTaller:
             📋 <strong>Nota:</strong> El TALLER no genera producción directa. Este informe permite controlar y analizar los gastos operacionales del taller.
         </div>
         
-        {f'''<div class="alerta-importante">
-            ⚠️ <strong>ATENCIÓN:</strong> Se detectaron {datos['cantidad_imputables']} gastos ({self._formatear_moneda(total_imputables)}) 
+"""
+
+# Aviso de gastos potencialmente imputables, sobre las tarjetas de resumen
+_ALERTA_IMPUTABLES = Template("""<div class="alerta-importante">
+            ⚠️ <strong>ATENCIÓN:</strong> Se detectaron $cantidad_imputables gastos ($total_imputables) 
             que mencionan códigos de máquinas en su descripción y podrían ser imputables a equipos específicos.
-        </div>''' if datos['cantidad_imputables'] > 0 else ''}
+        </div>""")
+
+# Cuerpo del informe hasta la tabla de detalle, cuyas filas se escriben aparte
+_PLANTILLA_CUERPO = Template("""        $alerta_imputables
         
         <div class="summary-cards">
             <div class="card">
                 <h3>Total Gastos TALLER</h3>
-                <div class="value">{self._formatear_moneda(datos['total_general'])}</div>
+                <div class="value">$total_general</div>
                 <div class="detail">Trimestre Q4 2025</div>
             </div>
             <div class="card operacionales">
                 <h3>Gastos Operacionales</h3>
-                <div class="value">{self._formatear_moneda(datos['total_gastos_op'])}</div>
+                <div class="value">$total_gastos_op</div>
                 <div class="detail">Reportes contables</div>
             </div>
             <div class="card repuestos">
                 <h3>Repuestos</h3>
-                <div class="value">{self._formatear_moneda(datos['total_repuestos'])}</div>
+                <div class="value">$total_repuestos</div>
                 <div class="detail">DATABODEGA</div>
             </div>
             <div class="card horas">
                 <h3>Horas Hombre</h3>
-                <div class="value">{self._formatear_numero(datos['total_horas_hombre'], 0)} H</div>
-                <div class="detail">{self._formatear_moneda(datos['total_costo_hh'])} ($35.000/h)</div>
+                <div class="value">$total_horas_hombre H</div>
+                <div class="detail">$total_costo_hh ($$35.000/h)</div>
             </div>
             <div class="card imputables">
                 <h3>Potencialmente Imputables</h3>
-                <div class="value">{self._formatear_moneda(total_imputables)}</div>
-                <div class="detail">{datos['cantidad_imputables']} operaciones ({self._formatear_numero(porcentaje_imputables, 1)}%)</div>
+                <div class="value">$total_imputables</div>
+                <div class="detail">$cantidad_imputables operaciones ($porcentaje_imputables%)</div>
             </div>
             <div class="card">
                 <h3>Total Operaciones</h3>
-                <div class="value">{datos['cantidad_gastos']}</div>
+                <div class="value">$cantidad_gastos</div>
                 <div class="detail">Registros procesados</div>
             </div>
         </div>
         
-        <div class="tabs">
-            <button class="tab active" onclick="mostrarTab('resumen')">📊 Resumen Mensual</button>
-            <button class="tab" onclick="mostrarTab('categorias')">📈 Por Categoría</button>
-            <button class="tab" onclick="mostrarTab('detalle')">📋 Detalle Completo</button>
-            <button class="tab" onclick="mostrarTab('imputables')">🎯 Gastos Imputables</button>
+        <div class="tabs" data-nav="principal">
+            <button class="tab active" data-destino="resumen">📊 Resumen Mensual</button>
+            <button class="tab" data-destino="categorias">📈 Por Categoría</button>
+            <button class="tab" data-destino="detalle">📋 Detalle Completo</button>
+            <button class="tab" data-destino="imputables">🎯 Gastos Imputables</button>
         </div>
         
         <!-- Tab: Resumen Mensual -->
         <div id="tab-resumen" class="tab-content active">
             <div class="section">
                 <h2>📊 Resumen de Gastos por Mes</h2>
-                <div class="tabs">
-                    <button class="tab active" onclick="mostrarSubTab('tab-resumen-oct')">Octubre 2025</button>
-                    <button class="tab" onclick="mostrarSubTab('tab-resumen-nov')">Noviembre 2025</button>
-                    <button class="tab" onclick="mostrarSubTab('tab-resumen-dic')">Diciembre 2025</button>
-                    <button class="tab" onclick="mostrarSubTab('tab-resumen-trimestral')">Resumen Trimestral</button>
+                <div class="tabs" data-nav="resumen">
+                    <button class="tab active" data-destino="tab-resumen-oct">Octubre 2025</button>
+                    <button class="tab" data-destino="tab-resumen-nov">Noviembre 2025</button>
+                    <button class="tab" data-destino="tab-resumen-dic">Diciembre 2025</button>
+                    <button class="tab" data-destino="tab-resumen-trimestral">Resumen Trimestral</button>
                 </div>
 
                 <div id="tab-resumen-oct" class="sub-tab-content active">
@@ -593,7 +421,7 @@ class HTMLExporterTaller:
                                 </tr>
                             </thead>
                             <tbody>
-                                {filas_resumen_oct}
+                                $filas_resumen_oct
                             </tbody>
                         </table>
                     </div>
@@ -611,7 +439,7 @@ class HTMLExporterTaller:
                                 </tr>
                             </thead>
                             <tbody>
-                                {filas_resumen_nov}
+                                $filas_resumen_nov
                             </tbody>
                         </table>
                     </div>
@@ -629,7 +457,7 @@ class HTMLExporterTaller:
                                 </tr>
                             </thead>
                             <tbody>
-                                {filas_resumen_dic}
+                                $filas_resumen_dic
                             </tbody>
                         </table>
                     </div>
@@ -650,7 +478,7 @@ class HTMLExporterTaller:
                                 </tr>
                             </thead>
                             <tbody>
-                                {filas_resumen_trimestral}
+                                $filas_resumen_trimestral
                             </tbody>
                         </table>
                     </div>
@@ -664,10 +492,13 @@ class HTMLExporterTaller:
                 <h2>📈 Distribución por Categoría</h2>
                 <div class="charts-grid">
                     <div class="chart-container">
-                        <canvas id="chartCategorias"></canvas>
+                        $svg_gastos_mensuales
+                    </div>
+                    <div class="chart-container">
+                        $svg_categorias
                     </div>
                     <div class="chart-container">
-                        <canvas id="chartCategoriasBar"></canvas>
+                        $svg_categorias_barras
                     </div>
                 </div>
             </div>
@@ -690,7 +521,10 @@ class HTMLExporterTaller:
                             </tr>
                         </thead>
                         <tbody>
-                            {filas_detalle}
+                            """)
+
+# Resto del cuerpo desde el cierre de la tabla de detalle: pestaña de imputables
+_PLANTILLA_IMPUTABLES = Template("""
                         </tbody>
                     </table>
                 </div>
@@ -705,11 +539,11 @@ class HTMLExporterTaller:
                     Estos gastos mencionan códigos de máquinas en su descripción y podrían reasignarse
                     para un mejor control de costos por equipo.
                 </p>
-                <div class="tabs">
-                    <button class="tab active" onclick="mostrarSubTabImputables('tab-imputables-oct')">Octubre 2025</button>
-                    <button class="tab" onclick="mostrarSubTabImputables('tab-imputables-nov')">Noviembre 2025</button>
-                    <button class="tab" onclick="mostrarSubTabImputables('tab-imputables-dic')">Diciembre 2025</button>
-                    <button class="tab" onclick="mostrarSubTabImputables('tab-imputables-trimestral')">Resumen Trimestral</button>
+                <div class="tabs" data-nav="imputables">
+                    <button class="tab active" data-destino="tab-imputables-oct">Octubre 2025</button>
+                    <button class="tab" data-destino="tab-imputables-nov">Noviembre 2025</button>
+                    <button class="tab" data-destino="tab-imputables-dic">Diciembre 2025</button>
+                    <button class="tab" data-destino="tab-imputables-trimestral">Resumen Trimestral</button>
                 </div>
 
                 <div id="tab-imputables-oct" class="sub-tab-content active">
@@ -727,7 +561,7 @@ class HTMLExporterTaller:
                                 </tr>
                             </thead>
                             <tbody>
-                                {filas_imputables_oct}
+                                $filas_imputables_oct
                             </tbody>
                         </table>
                     </div>
@@ -748,7 +582,7 @@ class HTMLExporterTaller:
                                 </tr>
                             </thead>
                             <tbody>
-                                {filas_imputables_nov}
+                                $filas_imputables_nov
                             </tbody>
                         </table>
                     </div>
@@ -769,7 +603,7 @@ class HTMLExporterTaller:
                                 </tr>
                             </thead>
                             <tbody>
-                                {filas_imputables_dic}
+                                $filas_imputables_dic
                             </tbody>
                         </table>
                     </div>
@@ -791,7 +625,7 @@ class HTMLExporterTaller:
                                 </tr>
                             </thead>
                             <tbody>
-                                {filas_imputables_trimestral}
+                                $filas_imputables_trimestral
                             </tbody>
                         </table>
                     </div>
@@ -800,487 +634,683 @@ class HTMLExporterTaller:
         </div>
     </div>
     
-    <script>
-        // Datos para gráficos
-        const datosCategorias = {datos_grafico_categorias};
-        const datosMeses = {datos_grafico_meses_json};
-        
-        // Gráfico de barras mensual
-        new Chart(document.getElementById('chartMensual'), {{
-            type: 'bar',
-            data: {{
-                labels: Object.keys(datosMeses),
-                datasets: [{{
-                    label: 'Total Gastos por Mes',
-                    data: Object.values(datosMeses),
-                    backgroundColor: 'rgba(231, 76, 60, 0.7)',
-                    borderColor: 'rgba(192, 57, 43, 1)',
-                    borderWidth: 1
-                }}]
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: false,
-                plugins: {{
-                    title: {{
-                        display: true,
-                        text: 'Gastos Mensuales TALLER (CLP)',
-                        font: {{ size: 16 }}
-                    }}
-                }},
-                scales: {{
-                    y: {{
-                        beginAtZero: true,
-                        ticks: {{
-                            callback: function(value) {{
-                                return '$' + value.toLocaleString('es-CL');
-                            }}
-                        }}
-                    }}
-                }}
-            }}
-        }});
-        
-        // Gráfico de dona por categoría
-        const coloresCategorias = [
-            '#e74c3c', '#3498db', '#9b59b6', '#e67e22', '#27ae60',
-            '#f39c12', '#1abc9c', '#34495e', '#95a5a6', '#d35400',
-            '#c0392b', '#2980b9', '#8e44ad', '#16a085', '#2c3e50'
-        ];
-        
-        new Chart(document.getElementById('chartCategorias'), {{
-            type: 'doughnut',
-            data: {{
-                labels: Object.keys(datosCategorias),
-                datasets: [{{
-                    data: Object.values(datosCategorias),
-                    backgroundColor: coloresCategorias
-                }}]
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: false,
-                plugins: {{
-                    title: {{
-                        display: true,
-                        text: 'Distribución por Categoría',
-                        font: {{ size: 16 }}
-                    }},
-                    legend: {{
-                        position: 'right',
-                        labels: {{
-                            font: {{ size: 11 }}
-                        }}
-                    }},
-                    tooltip: {{
-                        callbacks: {{
-                            label: function(context) {{
-                                const value = context.parsed;
-                                const total = context.dataset.data.reduce((a, b) => a + b, 0);
-                                const percentage = ((value / total) * 100).toFixed(1);
-                                return context.label + ': $' + value.toLocaleString('es-CL') + ' (' + percentage + '%)';
-                            }}
-                        }}
-                    }}
-                }}
-            }}
-        }});
-        
-        // Gráfico de barras horizontales por categoría
-        new Chart(document.getElementById('chartCategoriasBar'), {{
-            type: 'bar',
-            data: {{
-                labels: Object.keys(datosCategorias),
-                datasets: [{{
-                    label: 'Monto por Categoría',
-                    data: Object.values(datosCategorias),
-                    backgroundColor: coloresCategorias
-                }}]
-            }},
-            options: {{
-                indexAxis: 'y',
-                responsive: true,
-                maintainAspectRatio: false,
-                plugins: {{
-                    title: {{
-                        display: true,
-                        text: 'Gastos por Categoría (CLP)',
-                        font: {{ size: 16 }}
-                    }},
-                    legend: {{
-                        display: false
-                    }}
-                }},
-                scales: {{
-                    x: {{
-                        beginAtZero: true,
-                        ticks: {{
-                            callback: function(value) {{
-                                return '$' + value.toLocaleString('es-CL');
-                            }}
-                        }}
-                    }}
-                }}
-            }}
-        }});
-        
+""")
+
+# Código JS del informe (navegación entre tabs; los gráficos son SVG estático).
+# Es idéntico en todas las exportaciones: se incrusta en el HTML o se escribe
+# como archivo aparte (ver HTMLExporterTaller(js_externo=True)).
+_JS_NAVEGACION = """        // La estructura de tabs es estática: se consulta una sola vez al cargar
+        const CONTENIDOS_PRINCIPALES = ['resumen', 'categorias', 'detalle', 'imputables'].map(id => document.getElementById('tab-' + id));
+        const TABS_PRINCIPALES = document.querySelectorAll('.container > .tabs > .tab');
+        const CONTENIDOS_RESUMEN = document.querySelectorAll('#tab-resumen .sub-tab-content[id^="tab-resumen-"]');
+        const SUBTABS_RESUMEN = document.querySelectorAll('#tab-resumen > .section > .tabs > .tab');
+        const CONTENIDOS_IMPUTABLES = document.querySelectorAll('#tab-imputables .sub-tab-content[id^="tab-imputables-"]');
+        const SUBTABS_IMPUTABLES = document.querySelectorAll('#tab-imputables > .section > .tabs > .tab');
+
+        // Activa un sub-tab dentro de un grupo (contenidos + botones)
+        function activarSubTab(contenidos, botones, contenido, boton) {
+            contenidos.forEach(c => c.classList.remove('active'));
+            botones.forEach(t => t.classList.remove('active'));
+            if (contenido) contenido.classList.add('active');
+            if (boton) boton.classList.add('active');
+        }
+
         // Navegación de tabs principales
-        function mostrarTab(tabId) {{
+        function mostrarTab(tabId, boton) {
             // Ocultar solo los tabs principales (hijos directos del contenedor principal)
-            const mainTabIds = ['resumen', 'categorias', 'detalle', 'imputables'];
-            mainTabIds.forEach(id => {{
-                const tabContent = document.getElementById('tab-' + id);
-                if (tabContent) tabContent.classList.remove('active');
-            }});
-            document.querySelectorAll('.container > .tabs > .tab').forEach(tab => {{
-                tab.classList.remove('active');
-            }});
+            CONTENIDOS_PRINCIPALES.forEach(c => {
+                if (c) c.classList.remove('active');
+            });
+            TABS_PRINCIPALES.forEach(tab => tab.classList.remove('active'));
 
             // Mostrar el tab seleccionado
             const selectedTab = document.getElementById('tab-' + tabId);
             if (selectedTab) selectedTab.classList.add('active');
-            event.target.classList.add('active');
+            boton.classList.add('active');
 
             // Al cambiar a un tab con subtabs, activar el primero
-            if (tabId === 'resumen') {{
-                // Activar el primer sub-tab y su botón
-                document.querySelectorAll('#tab-resumen .sub-tab-content[id^="tab-resumen-"]').forEach(c => c.classList.remove('active'));
-                document.querySelectorAll('#tab-resumen > .section > .tabs > .tab').forEach(t => t.classList.remove('active'));
-
-                const firstSubTab = document.getElementById('tab-resumen-oct');
-                const firstSubTabBtn = document.querySelector('#tab-resumen > .section > .tabs > .tab');
-                if (firstSubTab) firstSubTab.classList.add('active');
-                if (firstSubTabBtn) firstSubTabBtn.classList.add('active');
-            }}
-            if (tabId === 'imputables') {{
-                // Activar el primer sub-tab y su botón
-                document.querySelectorAll('#tab-imputables .sub-tab-content[id^="tab-imputables-"]').forEach(c => c.classList.remove('active'));
-                document.querySelectorAll('#tab-imputables > .section > .tabs > .tab').forEach(t => t.classList.remove('active'));
-
-                const firstSubTab = document.getElementById('tab-imputables-oct');
-                const firstSubTabBtn = document.querySelector('#tab-imputables > .section > .tabs > .tab');
-                if (firstSubTab) firstSubTab.classList.add('active');
-                if (firstSubTabBtn) firstSubTabBtn.classList.add('active');
-            }}
-        }}
+            if (tabId === 'resumen') {
+                activarSubTab(CONTENIDOS_RESUMEN, SUBTABS_RESUMEN, document.getElementById('tab-resumen-oct'), SUBTABS_RESUMEN[0]);
+            }
+            if (tabId === 'imputables') {
+                activarSubTab(CONTENIDOS_IMPUTABLES, SUBTABS_IMPUTABLES, document.getElementById('tab-imputables-oct'), SUBTABS_IMPUTABLES[0]);
+            }
+        }
 
         // Navegación de sub-tabs de Resumen
-        function mostrarSubTab(subTabId) {{
-            // Solo afectar los subtabs dentro de #tab-resumen
-            const subContents = document.querySelectorAll('#tab-resumen .sub-tab-content[id^="tab-resumen-"]');
-            const subTabs = document.querySelectorAll('#tab-resumen > .section > .tabs > .tab');
-
-            subContents.forEach(c => {{
-                if (c.id && c.id.startsWith('tab-resumen-')) {{
-                    c.classList.remove('active');
-                }}
-            }});
-            subTabs.forEach(t => t.classList.remove('active'));
-
-            const targetTab = document.getElementById(subTabId);
-            if (targetTab) targetTab.classList.add('active');
-            if (event.target) event.target.classList.add('active');
-        }}
+        function mostrarSubTab(subTabId, boton) {
+            activarSubTab(CONTENIDOS_RESUMEN, SUBTABS_RESUMEN, document.getElementById(subTabId), boton);
+        }
 
         // Navegación de sub-tabs de Imputables
-        function mostrarSubTabImputables(subTabId) {{
-            // Solo afectar los subtabs dentro de #tab-imputables
-            const subContents = document.querySelectorAll('#tab-imputables .sub-tab-content[id^="tab-imputables-"]');
-            const subTabs = document.querySelectorAll('#tab-imputables > .section > .tabs > .tab');
-
-            subContents.forEach(c => {{
-                if (c.id && c.id.startsWith('tab-imputables-')) {{
-                    c.classList.remove('active');
-                }}
-            }});
-            subTabs.forEach(t => t.classList.remove('active'));
-
-            const targetTab = document.getElementById(subTabId);
-            if (targetTab) targetTab.classList.add('active');
-            if (event.target) event.target.classList.add('active');
-        }}
-    </script>
+        function mostrarSubTabImputables(subTabId, boton) {
+            activarSubTab(CONTENIDOS_IMPUTABLES, SUBTABS_IMPUTABLES, document.getElementById(subTabId), boton);
+        }
+
+        // Un único listener delegado para todos los grupos de tabs (data-nav indica el grupo)
+        const NAVEGACION = { principal: mostrarTab, resumen: mostrarSubTab, imputables: mostrarSubTabImputables };
+        document.querySelector('.container').addEventListener('click', e => {
+            const boton = e.target.closest('.tabs > .tab');
+            if (!boton) return;
+            NAVEGACION[boton.parentElement.dataset.nav](boton.dataset.destino, boton);
+        });
+
+"""
+
+_NOMBRE_JS = 'informe_taller.js'
+
+_SCRIPT_NAVEGACION = "    <script>\n" + _JS_NAVEGACION + """    </script>
+</body>
+</html>
+"""
+_SCRIPT_EXTERNO = f"""    <script src="{_NOMBRE_JS}"></script>
 </body>
 </html>
 """
-        return html
+
+
+class HTMLExporterTaller:
+    """
+    Exporta los datos de gastos de TALLER a un archivo HTML.
     
-    def _generar_filas_resumen_mensual(self, gastos_por_mes: Dict[int, Dict]) -> str:
-        """Genera las filas de la tabla de resumen mensual."""
-        filas = []
-        
-        for mes in sorted(gastos_por_mes.keys()):
-            g = gastos_por_mes[mes]
-            otros = (
-                g.get('peajes', Decimal('0')) +
-                g.get('remuneraciones', Decimal('0')) +
-                g.get('permisos', Decimal('0')) +
-                g.get('alimentacion', Decimal('0')) +
-                g.get('pasajes', Decimal('0')) +
-                g.get('correspondencia', Decimal('0')) +
-                g.get('gastos_legales', Decimal('0')) +
-                g.get('multas', Decimal('0')) +
-                g.get('otros_gastos', Decimal('0'))
-            )
-            
-            fila = f"""<tr>
-                <td><strong>{self.MESES[mes]}</strong></td>
-                <td>{self._formatear_moneda(g.get('repuestos', Decimal('0')))}</td>
-                <td>{self._formatear_numero(g.get('horas_hombre', Decimal('0')), 0)}</td>
-                <td>{self._formatear_moneda(g.get('costo_hh', Decimal('0')))}</td>
-                <td>{self._formatear_moneda(g.get('combustibles', Decimal('0')))}</td>
-                <td>{self._formatear_moneda(g.get('reparaciones', Decimal('0')))}</td>
-                <td>{self._formatear_moneda(g.get('seguros', Decimal('0')))}</td>
-                <td>{self._formatear_moneda(g.get('honorarios', Decimal('0')))}</td>
-                <td>{self._formatear_moneda(g.get('epp', Decimal('0')))}</td>
-                <td>{self._formatear_moneda(otros)}</td>
-                <td class="negative"><strong>{self._formatear_moneda(g.get('total', Decimal('0')))}</strong></td>
+    Crea un dashboard con:
+    - Resumen de gastos totales
+    - Desglose por categoría de gasto
+    - Detalle mensual
+    - Identificación de gastos imputables a máquinas
+    """
+    
+    MESES = {
+        1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril',
+        5: 'Mayo', 6: 'Junio', 7: 'Julio', 8: 'Agosto',
+        9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
+    }
+    
+    # Clave del desglose mensual según el código de tipo de gasto;
+    # los códigos que no aparecen se acumulan en 'otros_gastos'
+    CLAVE_POR_TIPO = {
+        TipoGasto.COMBUSTIBLES.value: 'combustibles',
+        TipoGasto.REPARACIONES.value: 'reparaciones',
+        TipoGasto.SEGUROS.value: 'seguros',
+        TipoGasto.HONORARIOS.value: 'honorarios',
+        TipoGasto.EPP.value: 'epp',
+        TipoGasto.PEAJES.value: 'peajes',
+        TipoGasto.REMUNERACIONES.value: 'remuneraciones',
+        TipoGasto.PERMISOS.value: 'permisos',
+        TipoGasto.ALIMENTACION.value: 'alimentacion',
+        TipoGasto.PASAJES.value: 'pasajes',
+        TipoGasto.CORRESPONDENCIA.value: 'correspondencia',
+        TipoGasto.GASTOS_LEGALES.value: 'gastos_legales',
+        TipoGasto.MULTAS.value: 'multas'
+    }
+    
+    # Plantilla de fila de la tabla de detalle:
+    # fecha, mes, tipo, glosa (title), glosa truncada, monto, origen
+    FILA_DETALLE = """<tr>
+                <td>{0}</td>
+                <td>{1}</td>
+                <td>{2}</td>
+                <td class="comentario" title="{3}">{4}</td>
+                <td class="negative">{5}</td>
+                <td>{6}</td>
             </tr>"""
-            filas.append(fila)
+    
+    def __init__(self, ruta_salida: str, comprimir: bool = False, js_externo: bool = False):
+        """
+        Inicializa el exportador.
         
-        return '\n'.join(filas)
+        Args:
+            ruta_salida: Ruta donde se guardará el archivo HTML
+            comprimir: Si es True, el informe se escribe comprimido con gzip
+                en ruta_salida + '.gz' (p. ej. informe_taller.html.gz)
+            js_externo: Si es True, el código de navegación se escribe
+                en informe_taller.js junto al HTML y se carga con <script src>;
+                por defecto se incrusta para que el informe sea autocontenido
+        """
+        self.ruta_salida = Path(ruta_salida)
+        self.comprimir = comprimir
+        self.js_externo = js_externo
     
-    def _generar_filas_detalle(self, gastos: List[GastoOperacional]) -> str:
-        """Genera las filas de la tabla de detalle."""
-        filas = []
+    def _formatear_moneda(self, valor: Decimal) -> str:
+        """Formatea un valor como moneda chilena."""
+        return formatear_moneda(valor)
+    
+    def _formatear_numero(self, valor: Decimal, decimales: int = 2) -> str:
+        """Formatea un número con decimales."""
+        return formatear_numero(valor, decimales)
+    
+    def exportar(
+        self,
+        gastos_taller: List[GastoOperacional],
+        repuestos_taller: Optional[List[Repuesto]] = None,
+        horas_hombre_taller: Optional[List[HorasHombre]] = None
+    ):
+        """
+        Exporta los gastos de taller a HTML.
+
+        Args:
+            gastos_taller: Lista de gastos operacionales de taller
+            repuestos_taller: Lista de repuestos usados en taller (opcional)
+            horas_hombre_taller: Lista de horas hombre de taller (opcional)
+        """
+        # Calcular datos agregados
+        datos = self._calcular_datos(
+            gastos_taller,
+            repuestos_taller or [],
+            horas_hombre_taller or []
+        )
+
+        # Generar y guardar el HTML por partes, sin armar un único string
+        if self.js_externo:
+            self._escribir_js()
+        escribir_partes(self.ruta_salida, self._generar_html(datos, gastos_taller), self.comprimir)
+    
+    def _escribir_js(self):
+        """Escribe informe_taller.js junto al HTML solo si falta o quedó desactualizado."""
+        ruta_js = self.ruta_salida.with_name(_NOMBRE_JS)
+        if ruta_js.exists() and ruta_js.read_text(encoding='utf-8') == _JS_NAVEGACION:
+            return
+        ruta_js.write_text(_JS_NAVEGACION, encoding='utf-8')
+    
+    def _calcular_datos(
+        self,
+        gastos: List[GastoOperacional],
+        repuestos: List[Repuesto],
+        horas_hombre: List[HorasHombre]
+    ) -> Dict:
+        """Calcula los datos agregados para el informe."""
         
-        # Ordenar por fecha
-        gastos_ordenados = sorted(gastos, key=lambda g: g.fecha)
+        # Totales generales
+        total_gastos_op = Decimal('0')
+        total_repuestos = Decimal('0')
+        total_horas_hombre = Decimal('0')
+        total_costo_hh = Decimal('0')
         
-        for gasto in gastos_ordenados:
+        # Por mes
+        gastos_por_mes: Dict[int, Dict[str, Decimal]] = defaultdict(
+            lambda: dict.fromkeys(_CLAVES_GASTOS_MES, _ZERO)
+        )
+        
+        # Por categoría
+        gastos_por_categoria: Dict[str, Decimal] = defaultdict(Decimal)
+        
+        # Gastos con comentarios que mencionan máquinas (potencialmente imputables)
+        gastos_imputables: List[GastoImputable] = []
+        total_imputables = _ZERO
+        
+        COSTO_HORA = Decimal('35000')
+        
+        # Procesar gastos operacionales
+        clave_por_tipo = self.CLAVE_POR_TIPO
+        for gasto in gastos:
             if gasto.es_ingreso:
                 continue
             
-            glosa_truncada = gasto.glosa[:50] + '...' if len(gasto.glosa) > 50 else gasto.glosa
+            # Atributos leídos una sola vez por gasto (mes y nombre son propiedades)
+            mes = gasto.mes
+            monto = gasto.monto
+            glosa = gasto.glosa
+            total_gastos_op += monto
             
-            fila = f"""<tr>
-                <td>{gasto.fecha.strftime('%d/%m/%Y')}</td>
-                <td>{self.MESES[gasto.mes]}</td>
-                <td>{gasto.nombre_tipo_gasto}</td>
-                <td class="comentario" title="{gasto.glosa}">{glosa_truncada}</td>
-                <td class="negative">{self._formatear_moneda(gasto.monto)}</td>
-                <td>{gasto.origen}</td>
-            </tr>"""
-            filas.append(fila)
+            # Clasificar por tipo
+            nombre_tipo = gasto.nombre_tipo_gasto
+            gastos_por_categoria[nombre_tipo] += monto
+            
+            # Clasificar por mes y tipo
+            gastos_mes = gastos_por_mes[mes]
+            gastos_mes[clave_por_tipo.get(gasto.tipo_gasto, 'otros_gastos')] += monto
+            gastos_mes['total'] += monto
+            
+            # Detectar gastos potencialmente imputables (glosa menciona código de máquina).
+            # Todo código lleva guion: sin '-' en la glosa no hace falta el regex
+            if '-' not in glosa:
+                continue
+            match = _PATRON_MAQUINA.search(glosa.upper())
+            if match:
+                total_imputables += monto
+                gastos_imputables.append(GastoImputable(
+                    gasto.fecha, mes, nombre_tipo, glosa, monto, match.group(0), gasto.origen
+                ))
         
-        return '\n'.join(filas)
+        # Procesar repuestos de taller
+        for repuesto in repuestos:
+            mes = repuesto.fecha_salida.month
+            total_repuestos += repuesto.total
+            gastos_mes = gastos_por_mes[mes]
+            gastos_mes['repuestos'] += repuesto.total
+            gastos_mes['total'] += repuesto.total
+            gastos_por_categoria['Repuestos'] += repuesto.total
+        
+        # Procesar horas hombre de taller
+        for hh in horas_hombre:
+            mes = hh.fecha.month
+            costo = hh.horas * COSTO_HORA
+            total_horas_hombre += hh.horas
+            total_costo_hh += costo
+            gastos_mes = gastos_por_mes[mes]
+            gastos_mes['horas_hombre'] += hh.horas
+            gastos_mes['costo_hh'] += costo
+            gastos_mes['total'] += costo
+            gastos_por_categoria['Horas Hombre'] += costo
+        
+        # Total general
+        total_general = total_gastos_op + total_repuestos + total_costo_hh
+        
+        return {
+            'total_general': total_general,
+            'total_gastos_op': total_gastos_op,
+            'total_repuestos': total_repuestos,
+            'total_horas_hombre': total_horas_hombre,
+            'total_costo_hh': total_costo_hh,
+            'gastos_por_mes': dict(gastos_por_mes),
+            'gastos_por_categoria': dict(gastos_por_categoria),
+            'gastos_imputables': gastos_imputables,
+            'total_imputables': total_imputables,
+            'cantidad_gastos': len(gastos),
+            'cantidad_imputables': len(gastos_imputables)
+        }
     
-    def _generar_filas_imputables(self, gastos_imputables: List[Dict]) -> str:
-        """Genera las filas de la tabla de gastos imputables."""
-        if not gastos_imputables:
-            return '<tr><td colspan="7" style="text-align: center; color: #666;">No se detectaron gastos imputables a máquinas específicas</td></tr>'
+    def _generar_html(self, datos: Dict, gastos: List[GastoOperacional]) -> Iterator[str]:
+        """Genera el contenido HTML completo, por partes."""
+
+        # Generar filas de tablas por mes (para sub-tabs)
+        gastos_por_mes = datos['gastos_por_mes']
+        agregados = self._precalcular_agregados(gastos_por_mes)
+        filas_resumen_oct = self._generar_filas_resumen_mensual_por_mes(agregados, 10)
+        filas_resumen_nov = self._generar_filas_resumen_mensual_por_mes(agregados, 11)
+        filas_resumen_dic = self._generar_filas_resumen_mensual_por_mes(agregados, 12)
+        filas_resumen_trimestral = self._generar_filas_resumen_trimestral_ordenado(agregados)
+
+        # Generar filas de gastos imputables por mes (para sub-tabs).
+        # Se ordena una sola vez por monto descendente y se agrupa por mes en una
+        # pasada: como sorted es estable, cada grupo queda ya ordenado
+        imputables_ordenados = sorted(datos['gastos_imputables'], key=attrgetter('monto'), reverse=True)
+        imputables_por_mes: Dict[int, List[GastoImputable]] = {10: [], 11: [], 12: []}
+        for imputable in imputables_ordenados:
+            imputables_por_mes.setdefault(imputable.mes, []).append(imputable)
+        filas_imputables_oct = self._generar_filas_imputables_por_mes(imputables_por_mes[10], 10)
+        filas_imputables_nov = self._generar_filas_imputables_por_mes(imputables_por_mes[11], 11)
+        filas_imputables_dic = self._generar_filas_imputables_por_mes(imputables_por_mes[12], 12)
+        filas_imputables_trimestral = self._generar_filas_imputables_ordenado(imputables_ordenados)
+        
+        # Gráficos: pocas series y puntos, se dibujan como SVG estático (sin Chart.js)
+        meses = self.MESES
+        meses_ordenados = sorted(datos['gastos_por_mes'].keys())
+        svg_gastos_mensuales = self._svg_bar_chart(
+            'Gastos Mensuales TALLER (CLP)',
+            [meses[mes] for mes in meses_ordenados],
+            [datos['gastos_por_mes'][mes]['total'] for mes in meses_ordenados]
+        )
+        gastos_por_categoria = datos['gastos_por_categoria']
+        etiquetas_categorias = list(gastos_por_categoria)
+        montos_categorias = list(gastos_por_categoria.values())
+        colores_categorias = _colores_categorias(len(etiquetas_categorias))
+        svg_categorias = self._svg_dona(
+            'Distribución por Categoría', etiquetas_categorias, montos_categorias, colores_categorias
+        )
+        svg_categorias_barras = self._svg_barras_horizontales(
+            'Gastos por Categoría (CLP)', etiquetas_categorias, montos_categorias, colores_categorias
+        )
         
-        filas = []
+        # Calcular porcentaje de imputables
+        porcentaje_imputables = Decimal('0')
+        total_imputables = datos['total_imputables']
+        if datos['total_general'] > 0:
+            porcentaje_imputables = (total_imputables / datos['total_general']) * 100
         
-        # Ordenar por máquina detectada
-        gastos_ordenados = sorted(gastos_imputables, key=lambda g: (g['maquina_detectada'], g['fecha']))
+        # Aviso de imputables (solo si se detectó alguno)
+        alerta_imputables = ''
+        if datos['cantidad_imputables'] > 0:
+            alerta_imputables = _ALERTA_IMPUTABLES.substitute(
+                cantidad_imputables=datos['cantidad_imputables'],
+                total_imputables=self._formatear_moneda(total_imputables)
+            )
+        
+        yield _CABECERA_HTML
+        yield _PLANTILLA_CUERPO.substitute(
+            alerta_imputables=alerta_imputables,
+            total_general=self._formatear_moneda(datos['total_general']),
+            total_gastos_op=self._formatear_moneda(datos['total_gastos_op']),
+            total_repuestos=self._formatear_moneda(datos['total_repuestos']),
+            total_horas_hombre=self._formatear_numero(datos['total_horas_hombre'], 0),
+            total_costo_hh=self._formatear_moneda(datos['total_costo_hh']),
+            total_imputables=self._formatear_moneda(total_imputables),
+            cantidad_imputables=datos['cantidad_imputables'],
+            porcentaje_imputables=self._formatear_numero(porcentaje_imputables, 1),
+            cantidad_gastos=datos['cantidad_gastos'],
+            filas_resumen_oct=filas_resumen_oct,
+            filas_resumen_nov=filas_resumen_nov,
+            filas_resumen_dic=filas_resumen_dic,
+            filas_resumen_trimestral=filas_resumen_trimestral,
+            svg_gastos_mensuales=svg_gastos_mensuales,
+            svg_categorias=svg_categorias,
+            svg_categorias_barras=svg_categorias_barras
+        )
+        # El detalle es la tabla más grande: sus filas se escriben a medida que se generan
+        yield from self._generar_filas_detalle(gastos)
+        yield _PLANTILLA_IMPUTABLES.substitute(
+            filas_imputables_oct=filas_imputables_oct,
+            filas_imputables_nov=filas_imputables_nov,
+            filas_imputables_dic=filas_imputables_dic,
+            filas_imputables_trimestral=filas_imputables_trimestral
+        )
+        yield _SCRIPT_EXTERNO if self.js_externo else _SCRIPT_NAVEGACION
+    
+    def _svg_bar_chart(self, titulo: str, etiquetas: List[str], valores: List[Decimal]) -> str:
+        """
+        Genera un gráfico de barras como SVG inline.
+
+        Se usa para series cortas (un punto por mes), donde no se justifica
+        cargar y ejecutar Chart.js en el navegador.
+        """
+        ancho, alto = 400, 300
+        margen_sup, margen_inf, margen_lat = 40, 40, 20
+        alto_util = alto - margen_sup - margen_inf
+        maximo = max(valores, default=Decimal('0'))
+
+        elementos = [
+            f'<text x="{ancho // 2}" y="22" text-anchor="middle" font-size="16" font-weight="bold" fill="#333">{titulo}</text>',
+            f'<line x1="{margen_lat}" y1="{alto - margen_inf}" x2="{ancho - margen_lat}" y2="{alto - margen_inf}" stroke="#999"/>',
+        ]
+        if etiquetas:
+            paso = (ancho - 2 * margen_lat) / len(etiquetas)
+            ancho_barra = paso * 0.6
+            for i, (etiqueta, valor) in enumerate(zip(etiquetas, valores)):
+                # Un total negativo (p. ej. por notas de crédito) se dibuja como barra vacía
+                alto_barra = float(max(valor, _ZERO) / maximo) * alto_util if maximo > 0 else 0.0
+                x = margen_lat + i * paso + (paso - ancho_barra) / 2
+                y = alto - margen_inf - alto_barra
+                centro = x + ancho_barra / 2
+                elementos.append(
+                    f'<rect x="{x:.1f}" y="{y:.1f}" width="{ancho_barra:.1f}" height="{alto_barra:.1f}" '
+                    f'fill="rgba(231, 76, 60, 0.7)" stroke="rgba(192, 57, 43, 1)"/>'
+                )
+                elementos.append(
+                    f'<text x="{centro:.1f}" y="{y - 6:.1f}" text-anchor="middle" font-size="12" fill="#333">{self._formatear_moneda(valor)}</text>'
+                )
+                elementos.append(
+                    f'<text x="{centro:.1f}" y="{alto - margen_inf + 18}" text-anchor="middle" font-size="12" fill="#555">{etiqueta}</text>'
+                )
+
+        return (
+            f'<svg viewBox="0 0 {ancho} {alto}" width="100%" height="100%" role="img" aria-label="{titulo}">'
+            + ''.join(elementos)
+            + '</svg>'
+        )
+
+    def _svg_dona(self, titulo: str, etiquetas: List[str], valores: List[Decimal], colores: List[str]) -> str:
+        """
+        Genera un gráfico de dona como SVG inline, con la leyenda a la derecha.
+
+        Cada sector es un arco de circunferencia dibujado con stroke-dasharray;
+        el monto y porcentaje de cada categoría quedan en su <title> (tooltip).
+        """
+        ancho, alto = 400, 300
+        cx, cy, radio, grosor = 95, 165, 65, 35
+        circunferencia = 2 * math.pi * radio
+        positivos = [max(valor, _ZERO) for valor in valores]
+        total = sum(positivos, _ZERO)
+        # La leyenda se comprime para que todas las categorías quepan bajo el título
+        paso_leyenda = min(16, (alto - 50) / max(len(etiquetas), 1))
+
+        elementos = [
+            f'<text x="{ancho // 2}" y="22" text-anchor="middle" font-size="16" font-weight="bold" fill="#333">{titulo}</text>',
+        ]
+        inicio = 0.0
+        for i, (etiqueta, valor, positivo, color) in enumerate(zip(etiquetas, valores, positivos, colores)):
+            porcentaje = (positivo / total) * 100 if total else _ZERO
+            texto = escape(f"{etiqueta}: {self._formatear_moneda(valor)} ({porcentaje:.1f}%)")
+            largo = float(positivo / total) * circunferencia if total else 0.0
+            if largo > 0:
+                elementos.append(
+                    f'<circle cx="{cx}" cy="{cy}" r="{radio}" fill="none" stroke="{color}" stroke-width="{grosor}" '
+                    f'stroke-dasharray="{largo:.2f} {circunferencia:.2f}" stroke-dashoffset="{-inicio:.2f}" '
+                    f'transform="rotate(-90 {cx} {cy})"><title>{texto}</title></circle>'
+                )
+                inicio += largo
+            y = 45 + i * paso_leyenda
+            elementos.append(
+                f'<rect x="190" y="{y:.1f}" width="10" height="10" fill="{color}"><title>{texto}</title></rect>'
+                f'<text x="205" y="{y + 9:.1f}" font-size="10" fill="#333">{escape(etiqueta)}</text>'
+            )
+
+        return (
+            f'<svg viewBox="0 0 {ancho} {alto}" width="100%" height="100%" role="img" aria-label="{titulo}">'
+            + ''.join(elementos)
+            + '</svg>'
+        )
+
+    def _svg_barras_horizontales(
+        self, titulo: str, etiquetas: List[str], valores: List[Decimal], colores: List[str]
+    ) -> str:
+        """Genera un gráfico de barras horizontales como SVG inline (una barra por categoría)."""
+        ancho, alto = 400, 300
+        margen_sup, margen_inf, margen_izq = 40, 10, 150
+        textos = [self._formatear_moneda(valor) for valor in valores]
+        # El margen derecho se ajusta al monto más largo (~6 px por carácter a
+        # font-size 10) para que la etiqueta de la barra más larga no se salga
+        margen_der = max((len(texto) for texto in textos), default=0) * 6 + 8
+        ancho_util = ancho - margen_izq - margen_der
+        maximo = max(valores, default=_ZERO)
+
+        elementos = [
+            f'<text x="{ancho // 2}" y="22" text-anchor="middle" font-size="16" font-weight="bold" fill="#333">{titulo}</text>',
+            f'<line x1="{margen_izq}" y1="{margen_sup}" x2="{margen_izq}" y2="{alto - margen_inf}" stroke="#999"/>',
+        ]
+        if etiquetas:
+            paso = (alto - margen_sup - margen_inf) / len(etiquetas)
+            alto_barra = paso * 0.7
+            for i, (etiqueta, valor, texto, color) in enumerate(zip(etiquetas, valores, textos, colores)):
+                largo = float(max(valor, _ZERO) / maximo) * ancho_util if maximo > 0 else 0.0
+                y = margen_sup + i * paso + (paso - alto_barra) / 2
+                centro = y + alto_barra / 2 + 3.5
+                elementos.append(
+                    f'<rect x="{margen_izq}" y="{y:.1f}" width="{largo:.1f}" height="{alto_barra:.1f}" fill="{color}"/>'
+                    f'<text x="{margen_izq - 5}" y="{centro:.1f}" text-anchor="end" font-size="10" fill="#555">{escape(etiqueta)}</text>'
+                    f'<text x="{margen_izq + largo + 4:.1f}" y="{centro:.1f}" font-size="10" fill="#333">{texto}</text>'
+                )
+
+        return (
+            f'<svg viewBox="0 0 {ancho} {alto}" width="100%" height="100%" role="img" aria-label="{titulo}">'
+            + ''.join(elementos)
+            + '</svg>'
+        )
+
+    def _generar_filas_detalle(self, gastos: List[GastoOperacional]) -> Iterator[str]:
+        """Genera las filas de la tabla de detalle, una a una (separadas por salto de línea)."""
+        separador = ''
+        meses = self.MESES
+        formato_fila = self.FILA_DETALLE.format
+        formatear_moneda = self._formatear_moneda
+        
+        # Ordenar por fecha
+        gastos_ordenados = sorted(gastos, key=attrgetter('fecha'))
         
         for gasto in gastos_ordenados:
-            glosa_truncada = gasto['glosa'][:40] + '...' if len(gasto['glosa']) > 40 else gasto['glosa']
+            if gasto.es_ingreso:
+                continue
             
-            fila = f"""<tr class="imputable-row">
-                <td>{gasto['fecha'].strftime('%d/%m/%Y')}</td>
-                <td>{self.MESES[gasto['mes']]}</td>
-                <td>{gasto['tipo']}</td>
-                <td><span class="maquina-badge">{gasto['maquina_detectada']}</span></td>
-                <td class="comentario" title="{gasto['glosa']}">{glosa_truncada}</td>
-                <td class="positive"><strong>{self._formatear_moneda(gasto['monto'])}</strong></td>
-                <td>{gasto['origen']}</td>
-            </tr>"""
-            filas.append(fila)
+            # Se trunca antes de escapar para no cortar una entidad a la mitad
+            glosa = gasto.glosa
+            glosa_truncada = glosa[:50] + '...' if len(glosa) > 50 else glosa
+            
+            yield separador + formato_fila(
+                gasto.fecha.strftime('%d/%m/%Y'), meses[gasto.mes], gasto.nombre_tipo_gasto,
+                escape(glosa), escape(glosa_truncada, quote=False),
+                formatear_moneda(gasto.monto), gasto.origen
+            )
+            separador = '\n'
+    
+    def _precalcular_agregados(self, gastos_por_mes: Dict[int, Dict[str, Decimal]]) -> AgregadosCategorias:
+        """
+        Extrae una sola vez los montos por categoría de cada mes del trimestre y
+        sus totales trimestrales, en listas alineadas con el orden de categorías.
+        """
+        montos_por_mes: Dict[int, List[Decimal]] = {}
+        totales_mes: Dict[int, Decimal] = {}
+        for mes in (10, 11, 12):
+            if mes in gastos_por_mes:
+                g = gastos_por_mes[mes]
+                montos_por_mes[mes] = list(_MONTOS_RESUMEN(g))
+                totales_mes[mes] = g['total']
 
-        return '\n'.join(filas)
+        # Totales trimestrales por categoría (sumados en orden de mes)
+        if montos_por_mes:
+            total_por_categoria = [sum(montos, _ZERO) for montos in zip(*montos_por_mes.values())]
+        else:
+            total_por_categoria = list(_CEROS_RESUMEN)
+
+        return AgregadosCategorias(_ETIQUETAS_RESUMEN, montos_por_mes, totales_mes, total_por_categoria)
 
-    def _generar_filas_resumen_mensual_por_mes(self, gastos_por_mes: Dict[int, Dict], mes: int) -> str:
-        """Genera las filas de la tabla de resumen para un mes específico, ordenadas por monto descendente."""
-        if mes not in gastos_por_mes:
+    def _generar_filas_resumen_mensual_por_mes(self, agregados: AgregadosCategorias, mes: int) -> str:
+        """
+        Genera las filas de la tabla de resumen para un mes específico, ordenadas por monto descendente.
+        
+        Args:
+            agregados: Montos por categoría precalculados por _precalcular_agregados
+            mes: Número del mes
+        """
+        montos = agregados.montos_por_mes.get(mes)
+        if montos is None:
             return '<tr><td colspan="3" style="text-align: center; color: #666;">No hay datos para este mes</td></tr>'
 
-        g = gastos_por_mes[mes]
-        total_mes = g.get('total', Decimal('0'))
-
-        # Crear lista de categorías con sus montos
-        categorias = [
-            ('Repuestos', g.get('repuestos', Decimal('0'))),
-            ('Horas Hombre', g.get('costo_hh', Decimal('0'))),
-            ('Combustibles', g.get('combustibles', Decimal('0'))),
-            ('Reparaciones', g.get('reparaciones', Decimal('0'))),
-            ('Seguros', g.get('seguros', Decimal('0'))),
-            ('Honorarios', g.get('honorarios', Decimal('0'))),
-            ('EPP', g.get('epp', Decimal('0'))),
-            ('Peajes', g.get('peajes', Decimal('0'))),
-            ('Remuneraciones', g.get('remuneraciones', Decimal('0'))),
-            ('Permisos', g.get('permisos', Decimal('0'))),
-            ('Alimentación', g.get('alimentacion', Decimal('0'))),
-            ('Pasajes', g.get('pasajes', Decimal('0'))),
-            ('Correspondencia', g.get('correspondencia', Decimal('0'))),
-            ('Gastos Legales', g.get('gastos_legales', Decimal('0'))),
-            ('Multas', g.get('multas', Decimal('0'))),
-            ('Otros Gastos', g.get('otros_gastos', Decimal('0')))
-        ]
+        total_mes = agregados.totales_mes[mes]
+        categorias = zip(agregados.categorias, montos)
 
         # Filtrar categorías con monto > 0 y ordenar por monto descendente
         categorias_con_monto = [(cat, monto) for cat, monto in categorias if monto > 0]
-        categorias_con_monto.sort(key=lambda x: x[1], reverse=True)
+        categorias_con_monto.sort(key=itemgetter(1), reverse=True)
 
         if not categorias_con_monto:
             return '<tr><td colspan="3" style="text-align: center; color: #666;">No hay gastos registrados para este mes</td></tr>'
 
         filas = []
+        formatear_moneda = self._formatear_moneda
+        formatear_numero = self._formatear_numero
         for categoria, monto in categorias_con_monto:
             porcentaje = (monto / total_mes * 100) if total_mes > 0 else Decimal('0')
             fila = f"""<tr>
                 <td><strong>{categoria}</strong></td>
-                <td class="negative">{self._formatear_moneda(monto)}</td>
-                <td>{self._formatear_numero(porcentaje, 1)}%</td>
+                <td class="negative">{formatear_moneda(monto)}</td>
+                <td>{formatear_numero(porcentaje, 1)}%</td>
             </tr>"""
             filas.append(fila)
 
         # Agregar fila del total
         filas.append(f"""<tr style="background: #f8f9fa; font-weight: bold;">
             <td>TOTAL {self.MESES[mes].upper()}</td>
-            <td class="negative">{self._formatear_moneda(total_mes)}</td>
+            <td class="negative">{formatear_moneda(total_mes)}</td>
             <td>100.0%</td>
         </tr>""")
 
         return '\n'.join(filas)
 
-    def _generar_filas_resumen_trimestral_ordenado(self, gastos_por_mes: Dict[int, Dict]) -> str:
+    def _generar_filas_resumen_trimestral_ordenado(self, agregados: AgregadosCategorias) -> str:
         """Genera las filas del resumen trimestral, ordenadas por total trimestral descendente."""
-        # Definir categorías
-        categorias = [
-            'Repuestos', 'Horas Hombre', 'Combustibles', 'Reparaciones', 'Seguros',
-            'Honorarios', 'EPP', 'Peajes', 'Remuneraciones', 'Permisos',
-            'Alimentación', 'Pasajes', 'Correspondencia', 'Gastos Legales',
-            'Multas', 'Otros Gastos'
-        ]
-
-        # Mapeo de categorías a claves en el diccionario
-        claves_categoria = {
-            'Repuestos': 'repuestos',
-            'Horas Hombre': 'costo_hh',
-            'Combustibles': 'combustibles',
-            'Reparaciones': 'reparaciones',
-            'Seguros': 'seguros',
-            'Honorarios': 'honorarios',
-            'EPP': 'epp',
-            'Peajes': 'peajes',
-            'Remuneraciones': 'remuneraciones',
-            'Permisos': 'permisos',
-            'Alimentación': 'alimentacion',
-            'Pasajes': 'pasajes',
-            'Correspondencia': 'correspondencia',
-            'Gastos Legales': 'gastos_legales',
-            'Multas': 'multas',
-            'Otros Gastos': 'otros_gastos'
-        }
-
-        # Calcular totales trimestrales por categoría
-        totales_trimestral = {}
-        for categoria in categorias:
-            totales_trimestral[categoria] = Decimal('0')
-
-        for mes in [10, 11, 12]:
-            if mes in gastos_por_mes:
-                g = gastos_por_mes[mes]
-                for categoria in categorias:
-                    clave = claves_categoria[categoria]
-                    totales_trimestral[categoria] += g.get(clave, Decimal('0'))
+        # Montos de cada mes por categoría (ceros para los meses sin datos)
+        montos_oct = agregados.montos_por_mes.get(10, _CEROS_RESUMEN)
+        montos_nov = agregados.montos_por_mes.get(11, _CEROS_RESUMEN)
+        montos_dic = agregados.montos_por_mes.get(12, _CEROS_RESUMEN)
 
         # Calcular total general del trimestre
-        total_general_trimestral = sum(totales_trimestral.values())
-
-        # Crear lista de categorías con sus totales y ordenar por monto descendente
-        categorias_con_total = [(cat, totales_trimestral[cat]) for cat in categorias]
-        categorias_con_total.sort(key=lambda x: x[1], reverse=True)
+        total_general_trimestral = sum(agregados.total_por_categoria)
 
-        # Filtrar solo categorías con monto > 0
-        categorias_con_total = [(cat, monto) for cat, monto in categorias_con_total if monto > 0]
+        # Categorías (con su posición) ordenadas por total descendente, solo las con monto > 0
+        categorias_con_total = sorted(
+            zip(agregados.categorias, range(len(agregados.categorias)), agregados.total_por_categoria),
+            key=itemgetter(2), reverse=True
+        )
+        categorias_con_total = [fila for fila in categorias_con_total if fila[2] > 0]
 
         if not categorias_con_total:
             return '<tr><td colspan="6" style="text-align: center; color: #666;">No hay gastos registrados en el trimestre</td></tr>'
 
         filas = []
-        for categoria, total_cat in categorias_con_total:
-            clave = claves_categoria[categoria]
-            monto_oct = gastos_por_mes.get(10, {}).get(clave, Decimal('0'))
-            monto_nov = gastos_por_mes.get(11, {}).get(clave, Decimal('0'))
-            monto_dic = gastos_por_mes.get(12, {}).get(clave, Decimal('0'))
+        formatear_moneda = self._formatear_moneda
+        formatear_numero = self._formatear_numero
+        for categoria, i, total_cat in categorias_con_total:
+            monto_oct = montos_oct[i]
+            monto_nov = montos_nov[i]
+            monto_dic = montos_dic[i]
             porcentaje = (total_cat / total_general_trimestral * 100) if total_general_trimestral > 0 else Decimal('0')
 
             fila = f"""<tr>
                 <td><strong>{categoria}</strong></td>
-                <td>{self._formatear_moneda(monto_oct) if monto_oct > 0 else '-'}</td>
-                <td>{self._formatear_moneda(monto_nov) if monto_nov > 0 else '-'}</td>
-                <td>{self._formatear_moneda(monto_dic) if monto_dic > 0 else '-'}</td>
-                <td class="negative"><strong>{self._formatear_moneda(total_cat)}</strong></td>
-                <td>{self._formatear_numero(porcentaje, 1)}%</td>
+                <td>{formatear_moneda(monto_oct) if monto_oct > 0 else '-'}</td>
+                <td>{formatear_moneda(monto_nov) if monto_nov > 0 else '-'}</td>
+                <td>{formatear_moneda(monto_dic) if monto_dic > 0 else '-'}</td>
+                <td class="negative"><strong>{formatear_moneda(total_cat)}</strong></td>
+                <td>{formatear_numero(porcentaje, 1)}%</td>
             </tr>"""
             filas.append(fila)
 
         # Agregar fila del total general
-        total_oct = Decimal(sum(gastos_por_mes.get(10, {}).get(claves_categoria[cat], Decimal('0')) for cat in categorias))
-        total_nov = Decimal(sum(gastos_por_mes.get(11, {}).get(claves_categoria[cat], Decimal('0')) for cat in categorias))
-        total_dic = Decimal(sum(gastos_por_mes.get(12, {}).get(claves_categoria[cat], Decimal('0')) for cat in categorias))
+        # El total de cada mes es la suma de sus categorías: ya viene en los agregados
+        totales_mes = agregados.totales_mes
+        total_oct = totales_mes.get(10, _ZERO)
+        total_nov = totales_mes.get(11, _ZERO)
+        total_dic = totales_mes.get(12, _ZERO)
 
         filas.append(f"""<tr style="background: #f8f9fa; font-weight: bold;">
             <td>TOTAL TRIMESTRAL</td>
-            <td>{self._formatear_moneda(total_oct) if total_oct > 0 else '-'}</td>
-            <td>{self._formatear_moneda(total_nov) if total_nov > 0 else '-'}</td>
-            <td>{self._formatear_moneda(total_dic) if total_dic > 0 else '-'}</td>
-            <td class="negative">{self._formatear_moneda(total_general_trimestral)}</td>
+            <td>{formatear_moneda(total_oct) if total_oct > 0 else '-'}</td>
+            <td>{formatear_moneda(total_nov) if total_nov > 0 else '-'}</td>
+            <td>{formatear_moneda(total_dic) if total_dic > 0 else '-'}</td>
+            <td class="negative">{formatear_moneda(total_general_trimestral)}</td>
             <td>100.0%</td>
         </tr>""")
 
         return '\n'.join(filas)
 
-    def _generar_filas_imputables_por_mes(self, gastos_imputables: List[Dict], mes: int) -> str:
-        """Genera las filas de gastos imputables para un mes específico, ordenadas por monto descendente."""
-        # Filtrar por mes
-        gastos_del_mes = [g for g in gastos_imputables if g['mes'] == mes]
-
+    def _generar_filas_imputables_por_mes(self, gastos_del_mes: List[GastoImputable], mes: int) -> str:
+        """
+        Genera las filas de gastos imputables para un mes específico.
+        
+        Args:
+            gastos_del_mes: Gastos imputables del mes, ya ordenados por monto descendente
+            mes: Número del mes
+        """
         if not gastos_del_mes:
             return f'<tr><td colspan="6" style="text-align: center; color: #666;">No hay gastos imputables para {self.MESES[mes]}</td></tr>'
 
-        # Ordenar por monto descendente
-        gastos_del_mes.sort(key=lambda g: g['monto'], reverse=True)
-
         filas = []
+        formatear_moneda = self._formatear_moneda
         for gasto in gastos_del_mes:
-            glosa_truncada = gasto['glosa'][:40] + '...' if len(gasto['glosa']) > 40 else gasto['glosa']
+            glosa = gasto.glosa
+            glosa_truncada = glosa[:40] + '...' if len(glosa) > 40 else glosa
 
             fila = f"""<tr class="imputable-row">
-                <td>{gasto['fecha'].strftime('%d/%m/%Y')}</td>
-                <td>{gasto['tipo']}</td>
-                <td><span class="maquina-badge">{gasto['maquina_detectada']}</span></td>
-                <td class="comentario" title="{gasto['glosa']}">{glosa_truncada}</td>
-                <td class="positive"><strong>{self._formatear_moneda(gasto['monto'])}</strong></td>
-                <td>{gasto['origen']}</td>
+                <td>{gasto.fecha.strftime('%d/%m/%Y')}</td>
+                <td>{gasto.tipo}</td>
+                <td><span class="maquina-badge">{gasto.maquina_detectada}</span></td>
+                <td class="comentario" title="{escape(glosa)}">{escape(glosa_truncada, quote=False)}</td>
+                <td class="positive"><strong>{formatear_moneda(gasto.monto)}</strong></td>
+                <td>{gasto.origen}</td>
             </tr>"""
             filas.append(fila)
 
         return '\n'.join(filas)
 
-    def _generar_filas_imputables_ordenado(self, gastos_imputables: List[Dict]) -> str:
-        """Genera todas las filas de gastos imputables ordenadas por monto descendente."""
+    def _generar_filas_imputables_ordenado(self, gastos_imputables: List[GastoImputable]) -> str:
+        """Genera todas las filas de gastos imputables, recibidos ya ordenados por monto descendente."""
         if not gastos_imputables:
             return '<tr><td colspan="7" style="text-align: center; color: #666;">No se detectaron gastos imputables a máquinas específicas</td></tr>'
 
-        # Ordenar por monto descendente
-        gastos_ordenados = sorted(gastos_imputables, key=lambda g: g['monto'], reverse=True)
-
         filas = []
-        for gasto in gastos_ordenados:
-            glosa_truncada = gasto['glosa'][:40] + '...' if len(gasto['glosa']) > 40 else gasto['glosa']
+        formatear_moneda = self._formatear_moneda
+        meses = self.MESES
+        for gasto in gastos_imputables:
+            glosa = gasto.glosa
+            glosa_truncada = glosa[:40] + '...' if len(glosa) > 40 else glosa
 
             fila = f"""<tr class="imputable-row">
-                <td>{gasto['fecha'].strftime('%d/%m/%Y')}</td>
-                <td>{self.MESES[gasto['mes']]}</td>
-                <td>{gasto['tipo']}</td>
-                <td><span class="maquina-badge">{gasto['maquina_detectada']}</span></td>
-                <td class="comentario" title="{gasto['glosa']}">{glosa_truncada}</td>
-                <td class="positive"><strong>{self._formatear_moneda(gasto['monto'])}</strong></td>
-                <td>{gasto['origen']}</td>
+                <td>{gasto.fecha.strftime('%d/%m/%Y')}</td>
+                <td>{meses[gasto.mes]}</td>
+                <td>{gasto.tipo}</td>
+                <td><span class="maquina-badge">{gasto.maquina_detectada}</span></td>
+                <td class="comentario" title="{escape(glosa)}">{escape(glosa_truncada, quote=False)}</td>
+                <td class="positive"><strong>{formatear_moneda(gasto.monto)}</strong></td>
+                <td>{gasto.origen}</td>
             </tr>"""
             filas.append(fila)
 
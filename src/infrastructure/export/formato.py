@@ -0,0 +1,57 @@
+"""
+Formato de montos y números para los informes HTML.
+
+Lo comparten HTMLExporter y HTMLExporterTaller, así ambos informes muestran
+los valores igual y usan una única caché.
+"""
+
+from decimal import Decimal
+from functools import lru_cache
+
+
+# Separador de miles chileno, aplicado en una sola pasada sobre el texto formateado
+_SEPARADOR_MILES = str.maketrans({',': '.'})
+
+
+def _formatear_entero(valor: Decimal) -> str:
+    """Equivale a f"{valor:,.0f}" con separador de miles chileno."""
+    # round() redondea igual que el formato ',.0f' (mitad al par) y el
+    # agrupamiento de miles sobre int es mucho más barato que sobre Decimal
+    entero = round(valor)
+    if not entero and valor.is_signed():
+        # El int pierde el signo de -0 y de los negativos que redondean a cero
+        return '-0'
+    return f"{entero:,}".translate(_SEPARADOR_MILES)
+
+
+@lru_cache(maxsize=8192, typed=True)
+def _formatear_moneda_cacheado(valor: Decimal) -> str:
+    return '$' + _formatear_entero(valor)
+
+
+@lru_cache(maxsize=8192, typed=True)
+def _formatear_numero_cacheado(valor: Decimal, decimales: int) -> str:
+    if decimales == 0:
+        return _formatear_entero(valor)
+    return f"{valor:,.{decimales}f}".translate(_SEPARADOR_MILES)
+
+
+def formatear_moneda(valor: Decimal) -> str:
+    """Formatea un valor como moneda chilena. Memoizado: ceros y totales se repiten mucho."""
+    if not valor and valor.is_signed():
+        # -0 es igual a 0 para la caché: se formatea sin ella para no perder el signo
+        return _formatear_moneda_cacheado.__wrapped__(valor)
+    return _formatear_moneda_cacheado(valor)
+
+
+def formatear_numero(valor: Decimal, decimales: int = 2) -> str:
+    """Formatea un número con decimales. Memoizado por (valor, decimales)."""
+    if not valor and valor.is_signed():
+        return _formatear_numero_cacheado.__wrapped__(valor, decimales)
+    return _formatear_numero_cacheado(valor, decimales)
+
+
+# El cero es el valor que más se formatea (columnas de gasto vacías): se deja
+# precargado en la caché de los formateadores al importar el módulo
+_formatear_moneda_cacheado(Decimal('0'))
+_formatear_numero_cacheado(Decimal('0'), 0)
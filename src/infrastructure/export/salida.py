@@ -0,0 +1,29 @@
+"""
+Escritura a disco de los informes HTML.
+
+La usan HTMLExporter y HTMLExporterTaller para escribir el documento por
+partes, comprimido o no, sin armar un único string.
+"""
+
+from pathlib import Path
+from typing import Iterable
+import gzip
+
+
+def escribir_partes(ruta: Path, partes: Iterable[str], comprimir: bool = False):
+    """
+    Escribe las partes de un documento en ruta, con un buffer amplio.
+
+    Args:
+        ruta: Ruta del archivo de salida
+        partes: Fragmentos de texto del documento, en orden
+        comprimir: Si es True, se escribe en ruta + '.gz' comprimido con gzip
+    """
+    if comprimir:
+        # Las partes se comprimen a medida que se escriben, sin armar el documento completo
+        ruta_gz = ruta.with_name(ruta.name + '.gz')
+        with gzip.open(ruta_gz, 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.writelines(partes)
+        return
+    with open(ruta, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.writelines(partes)
@@ -0,0 +1,61 @@
+"""Test del formato de montos y números de los informes HTML."""
+
+from decimal import Decimal
+from src.infrastructure.export.formato import formatear_moneda, formatear_numero
+
+
+def _referencia(valor: Decimal, decimales: int) -> str:
+    """Formato original de los exportadores, sin memoizar ni atajos."""
+    return f"{valor:,.{decimales}f}".replace(',', '.')
+
+
+def test_redondeo_mitad_al_par():
+    """Los montos redondean la mitad al par, como el formato ',.0f'."""
+    print("\n=== Test Redondeo Mitad al Par ===")
+    casos = {
+        '0.5': '$0', '1.5': '$2', '2.5': '$2', '3.5': '$4',
+        '-2.5': '$-2', '1234567.5': '$1.234.568', '1234568.5': '$1.234.568',
+    }
+    for valor, esperado in casos.items():
+        resultado = formatear_moneda(Decimal(valor))
+        print(f"  - {valor}: {resultado}")
+        assert resultado == esperado, f"Expected {esperado}, got {resultado}"
+    assert formatear_numero(Decimal('12.345'), 2) == '12.34'
+    assert formatear_numero(Decimal('12.355'), 2) == '12.36'
+
+
+def test_negativos_y_cero_negativo():
+    """Los negativos conservan el signo, también el -0."""
+    print("\n=== Test Negativos ===")
+    assert formatear_moneda(Decimal('-1234.5')) == '$-1.234'
+    assert formatear_numero(Decimal('-98765'), 0) == '-98.765'
+    assert formatear_numero(Decimal('-1234567.891'), 2) == '-1.234.567.89'
+    # -0 y los negativos que redondean a cero se muestran como el formato original
+    assert formatear_moneda(Decimal('-0')) == '$-0'
+    assert formatear_moneda(Decimal('-0.4')) == '$-0'
+    assert formatear_numero(Decimal('-0'), 0) == '-0'
+    assert formatear_numero(Decimal('-0.00'), 2) == '-0.00'
+    assert formatear_moneda(Decimal('0')) == '$0'
+    print("  Signos correctos")
+
+
+def test_equivale_al_formato_original():
+    """El formato memoizado coincide con el formato original en todos los casos."""
+    print("\n=== Test Formato Original ===")
+    valores = [
+        '0', '-0', '0.00', '-0.00', '0.5', '-0.5', '0.49', '-0.51', '7', '-7',
+        '999.5', '1000', '-1000.5', '1234.5', '12.345', '987654321.987', '-1234567.891',
+    ]
+    for texto in valores:
+        valor = Decimal(texto)
+        assert formatear_moneda(valor) == '$' + _referencia(valor, 0), texto
+        for decimales in (0, 1, 2):
+            assert formatear_numero(valor, decimales) == _referencia(valor, decimales), (texto, decimales)
+    print(f"  {len(valores)} valores iguales al formato original")
+
+
+if __name__ == '__main__':
+    test_redondeo_mitad_al_par()
+    test_negativos_y_cero_negativo()
+    test_equivale_al_formato_original()
+    print("\n=== TODOS LOS TESTS PASARON ===")
@@ -1,20 +1,38 @@
 """Test de verificación de la implementación de precios híbridos."""
 
+import sys
 from decimal import Decimal
 from src.domain.entities.PreciosContrato import PreciosContrato
 from src.infrastructure.excel.PreciosContratoExcelReader import PreciosContratoExcelReader
 from src.domain.services.PreciosContratoService import PreciosContratoService
 
 
+# Contratos de prueba: PreciosContrato es inmutable, así que se crean una sola
+# vez al importar y todos los tests comparten las mismas instancias
+_CONTRATOS = {
+    # Simple por hora
+    'CT01017Hr': PreciosContrato('CT01017Hr', 'Hr', precio_hora=Decimal('30000')),
+    # Híbrido Km+Hr
+    'CT00052KmHr': PreciosContrato(
+        'CT00052KmHr', 'Km , Hr',
+        precio_hora=Decimal('35000'),
+        precio_km=Decimal('2500')
+    ),
+    # Híbrido Mt3+Km
+    'CT00060Mt3Km': PreciosContrato(
+        'CT00060Mt3Km', 'Mt3 , Km',
+        precio_mt3=Decimal('1800'),
+        precio_km=Decimal('2800')
+    ),
+    # Sin precio
+    'CT00306Hr': PreciosContrato('CT00306Hr', 'Hr, Unidades'),
+}
+
+
 def test_precios_contrato():
     """Test básico de la entidad PreciosContrato."""
     print("=== Test PreciosContrato ===")
-    precio = PreciosContrato(
-        contrato_id='CT00052KmHr',
-        tipo='Km , Hr',
-        precio_hora=Decimal('35000'),
-        precio_km=Decimal('2500')
-    )
+    precio = _CONTRATOS['CT00052KmHr']
 
     print(f"  - Contrato: {precio.contrato_id}")
     print(f"  - Tipo: {precio.tipo}")
@@ -40,28 +58,10 @@ def test_servicio_precios():
     """Test del servicio de precios."""
     print("\n=== Test PreciosContratoService ===")
 
-    # Crear algunos precios de prueba
+    # Algunos precios de prueba (el servicio guarda el dict, así que va una copia)
     precios = {
-        'CT00052KmHr': PreciosContrato(
-            contrato_id='CT00052KmHr',
-            tipo='Km , Hr',
-            precio_hora=Decimal('35000'),
-            precio_km=Decimal('2500')
-        ),
-        'CT01017Hr': PreciosContrato(
-            contrato_id='CT01017Hr',
-            tipo='Hr',
-            precio_hora=Decimal('30000'),
-            precio_km=Decimal('0'),
-            precio_mt3=Decimal('0')
-        ),
-        'CT00306Hr': PreciosContrato(
-            contrato_id='CT00306Hr',
-            tipo='Hr, Unidades',
-            precio_hora=Decimal('0'),
-            precio_km=Decimal('0'),
-            precio_mt3=Decimal('0')
-        )
+        contrato_id: _CONTRATOS[contrato_id]
+        for contrato_id in ('CT00052KmHr', 'CT01017Hr', 'CT00306Hr')
     }
 
     servicio = PreciosContratoService()
@@ -96,42 +96,36 @@ def test_servicio_precios():
     print(f"  - Estadisticas: {stats}")
 
 
-def test_casos_reales():
-    """Test con casos reales del Excel."""
-    print("\n=== Test Casos Reales ===")
-
+def _calcular_casos_reales():
+    """Valoriza los casos reales del Excel, sin salida por consola ni aserciones."""
     # Caso 1: Contrato simple (CT01017Hr: 5Hr @ $30000)
-    contrato_simple = PreciosContrato('CT01017Hr', 'Hr', precio_hora=Decimal('30000'))
-    v1, u1, d1 = contrato_simple.calcular_valor_produccion(horas=Decimal('5'))
-    print(f"  - CT01017Hr (5Hr @ $30,000): ${int(v1):,}")
+    v1, _, _ = _CONTRATOS['CT01017Hr'].calcular_valor_produccion(horas=Decimal('5'))
 
     # Caso 2: Híbrido Km+Hr (CT00052KmHr: 3Hr @ $35,000 + 100Km @ $2,500)
-    contrato_hibrido1 = PreciosContrato(
-        'CT00052KmHr', 'Km , Hr',
-        precio_hora=Decimal('35000'),
-        precio_km=Decimal('2500')
-    )
-    v2, u2, d2 = contrato_hibrido1.calcular_valor_produccion(
+    v2, _, _ = _CONTRATOS['CT00052KmHr'].calcular_valor_produccion(
         horas=Decimal('3'),
         km=Decimal('100')
     )
-    print(f"  - CT00052KmHr (3Hr @ $35,000 + 100Km @ $2,500): ${int(v2):,}")
 
     # Caso 3: Híbrido Mt3+Km (CT00060Mt3Km: 50Mt3 @ $1,800 + 200Km @ $2,800)
-    contrato_hibrido2 = PreciosContrato(
-        'CT00060Mt3Km', 'Mt3 , Km',
-        precio_mt3=Decimal('1800'),
-        precio_km=Decimal('2800')
-    )
-    v3, u3, d3 = contrato_hibrido2.calcular_valor_produccion(
+    v3, _, _ = _CONTRATOS['CT00060Mt3Km'].calcular_valor_produccion(
         mt3=Decimal('50'),
         km=Decimal('200')
     )
-    print(f"  - CT00060Mt3Km (50Mt3 @ $1,800 + 200Km @ $2,800): ${int(v3):,}")
 
     # Caso 4: Sin precio (CT00306Hr)
-    contrato_sin_precio = PreciosContrato('CT00306Hr', 'Hr, Unidades')
-    v4, u4, d4 = contrato_sin_precio.calcular_valor_produccion(horas=Decimal('4'))
+    v4, _, _ = _CONTRATOS['CT00306Hr'].calcular_valor_produccion(horas=Decimal('4'))
+    return v1, v2, v3, v4
+
+
+def test_casos_reales():
+    """Test con casos reales del Excel."""
+    print("\n=== Test Casos Reales ===")
+
+    v1, v2, v3, v4 = _calcular_casos_reales()
+    print(f"  - CT01017Hr (5Hr @ $30,000): ${int(v1):,}")
+    print(f"  - CT00052KmHr (3Hr @ $35,000 + 100Km @ $2,500): ${int(v2):,}")
+    print(f"  - CT00060Mt3Km (50Mt3 @ $1,800 + 200Km @ $2,800): ${int(v3):,}")
     print(f"  - CT00306Hr (4Hr, sin precio): ${int(v4):,} (DEBERÍA SER 0)")
 
     # Verificar
@@ -143,6 +137,15 @@ def test_casos_reales():
 
 
 if __name__ == '__main__':
+    if '--bench' in sys.argv:
+        # Microbenchmark: mide solo la valorización de los casos reales,
+        # sin la salida por consola ni las aserciones del test
+        import time
+        inicio = time.perf_counter()
+        for _ in range(10000):
+            _calcular_casos_reales()
+        print(f"casos reales x10000: {time.perf_counter() - inicio:.3f}s")
+        sys.exit(0)
     test_precios_contrato()
     test_servicio_precios()
     test_casos_reales()
@@ -1,50 +1,128 @@
 from decimal import Decimal
 from collections import defaultdict
+from itertools import islice
+from pathlib import Path
+import hashlib
+import heapq
+import pickle
+import sys
 from src.infrastructure.csv.ReportesContablesReader import ReportesContablesReader
 from src.infrastructure.csv.RepuestosCSVReader import RepuestosCSVReader
 
+# Rutas relativas al script, como en main.py
+ruta_base = Path(__file__).parent
+ruta_gastos = ruta_base / 'gastos'
+
+# Los datos leídos se guardan en disco y se reutilizan mientras no cambien
+# los CSV (por fecha de modificación), el código de src/ (por contenido: las
+# entidades deserializadas dependen de él) ni la versión de Python
+CARPETA_CACHE = ruta_base / '.cache'
+
+
+def _firma_codigo():
+    """Hash del contenido de src/**/*.py y de la versión de Python."""
+    firma = hashlib.sha1(sys.version.encode())
+    for ruta in sorted((ruta_base / 'src').rglob('*.py')):
+        firma.update(str(ruta.relative_to(ruta_base)).encode())
+        firma.update(ruta.read_bytes())
+    return firma.hexdigest()
+
+
+def leer_con_cache(nombre, archivos, leer):
+    """Devuelve leer(), o el resultado guardado en una ejecución anterior con los mismos archivos."""
+    firma = repr((nombre, _firma_codigo(), sorted((str(a), a.stat().st_mtime_ns) for a in archivos)))
+    ruta_cache = CARPETA_CACHE / f'{nombre}_{hashlib.sha1(firma.encode()).hexdigest()}.pkl'
+    if ruta_cache.exists():
+        try:
+            with open(ruta_cache, 'rb') as f:
+                return pickle.load(f)
+        except (pickle.UnpicklingError, AttributeError, EOFError, ImportError):
+            # Caché corrupta o de otra versión de las clases: se vuelve a leer
+            pass
+    datos = leer()
+    CARPETA_CACHE.mkdir(exist_ok=True)
+    with open(ruta_cache, 'wb') as f:
+        pickle.dump(datos, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return datos
+
+
+# Mapeo de categorias a códigos de cuenta
+mapeo = {
+    'combustibles': '401010101',
+    'reparaciones': '401010102',
+    'seguros': '401010115',
+    'honorarios': '401010109',
+    'epp': '401010104',
+    'peajes': '401010105',
+    'remuneraciones': '401010108',
+    'permisos': '401010116',
+    'alimentacion': '401010112',
+    'pasajes': '401010111',
+    'correspondencia': '401020107',
+    'gastos_legales': '401020108',
+    'multas': '401030102',
+    'otros_gastos': '401030107'
+}
+# Índice inverso código -> categoría, para acumular por categoría en una sola pasada
+inv_mapeo = {codigo: cat for cat, codigo in mapeo.items()}
+
 print('=== VERIFICACIÓN DE DUPLICIDAD Y CÁLCULOS ===')
 
 # 1. Verificar que no haya registros duplicados
 print('\n1. VERIFICACIÓN DE REGISTROS DUPLICADOS')
 
 # Repuestos
-reader_rep = RepuestosCSVReader(r'C:\Users\patricio dunstan sae\GastosVsProduccion\gastos\DATABODEGA.csv')
-repuestos = reader_rep.leer()
-
-# Buscar duplicados exactos (misma máquina, fecha, nombre, cantidad, total)
-from collections import defaultdict
-
-repuestos_keyed = defaultdict(list)
+ruta_repuestos = ruta_gastos / 'DATABODEGA.csv'
+reader_rep = RepuestosCSVReader(str(ruta_repuestos))
+repuestos = leer_con_cache('repuestos', [ruta_repuestos], reader_rep.leer)
+
+# Buscar duplicados exactos (misma máquina, fecha, nombre, cantidad, total).
+# Basta contar las apariciones de cada clave: la clave ya trae lo que se informa.
+# Se cuenta en un dict simple con get(): casi todas las claves son nuevas y
+# Counter resuelve cada una con __missing__ en Python.
+# En la misma pasada se acumula el total directo de repuestos (paso 4)
+repuestos_keyed = {}
+total_directo_repuestos = Decimal('0')
 for rep in repuestos:
     key = (rep.codigo_maquina, rep.fecha_salida, rep.nombre, rep.cantidad, rep.total)
-    repuestos_keyed[key].append(rep)
+    repuestos_keyed[key] = repuestos_keyed.get(key, 0) + 1
+    total_directo_repuestos += rep.total
 
-duplicados_repuestos = {k: v for k, v in repuestos_keyed.items() if len(v) > 1}
+duplicados_repuestos = {k: n for k, n in repuestos_keyed.items() if n > 1}
 
 if duplicados_repuestos:
     print(f'   WARNING: {len(duplicados_repuestos)} grupos de repuestos duplicados encontrados')
-    for key, reps in list(duplicados_repuestos.items())[:5]:
-        print(f'      {key[0][:30]} | {key[1]} | {key[2][:30]} | {reps[0].total} x {len(reps)}')
+    for key, n in islice(duplicados_repuestos.items(), 5):
+        print(f'      {key[0][:30]} | {key[1]} | {key[2][:30]} | {key[4]} x {n}')
 else:
     print('   ✓ No se encontraron repuestos duplicados')
 
 # Gastos operacionales
-reader_gastos = ReportesContablesReader(r'C:\Users\patricio dunstan sae\GastosVsProduccion\gastos')
-gastos = reader_gastos.leer_todos_filtrados()
+reader_gastos = ReportesContablesReader(str(ruta_gastos))
+gastos = leer_con_cache('gastos', ruta_gastos.glob('*.csv'), reader_gastos.leer_todos_filtrados)
 
-gastos_keyed = defaultdict(list)
+# Una sola pasada sobre los gastos: duplicados y, para las cuentas 401xxx,
+# los totales directos por categoría (paso 3, solo códigos de mapeo) y general (paso 4)
+gastos_keyed = {}
+categorias_directo = defaultdict(lambda: Decimal('0'))
+total_directo_gastos = Decimal('0')
 for g in gastos:
-    if not g.es_ingreso:
-        key = (g.codigo_maquina, g.fecha, g.tipo_gasto, g.glosa, g.monto)
-        gastos_keyed[key].append(g)
-
-duplicados_gastos = {k: v for k, v in gastos_keyed.items() if len(v) > 1}
+    if g.es_ingreso:
+        continue
+    key = (g.codigo_maquina, g.fecha, g.tipo_gasto, g.glosa, g.monto)
+    gastos_keyed[key] = gastos_keyed.get(key, 0) + 1
+    if g.tipo_gasto.startswith('401'):
+        total_directo_gastos += g.monto
+        cat = inv_mapeo.get(g.tipo_gasto)
+        if cat is not None:
+            categorias_directo[cat] += g.monto
+
+duplicados_gastos = {k: n for k, n in gastos_keyed.items() if n > 1}
 
 if duplicados_gastos:
     print(f'   WARNING: {len(duplicados_gastos)} grupos de gastos duplicados encontrados')
-    for key, gs in list(duplicados_gastos.items())[:5]:
-        print(f'      {key[0][:30]} | {key[1]} | {key[2]} | {key[3][:30]} | {gs[0].monto} x {len(gs)}')
+    for key, n in islice(duplicados_gastos.items(), 5):
+        print(f'      {key[0][:30]} | {key[1]} | {key[2]} | {key[3][:30]} | {key[4]} x {n}')
 else:
     print('   ✓ No se encontraron gastos duplicados')
 
@@ -58,11 +136,12 @@ gastos_calculados = CalculadorGastos.calcular_por_maquina_mes_completo(
 )
 
 print('   Top 5 máquinas por gasto total:')
-sorted_maquinas = sorted(
+# Selección parcial: equivale a sorted(..., reverse=True)[:5] sin ordenar todo
+sorted_maquinas = heapq.nlargest(
+    5,
     gastos_calculados.items(),
-    key=lambda x: x[1]['total'],
-    reverse=True
-)[:5]
+    key=lambda x: x[1]['total']
+)
 
 for (maquina, mes), g in sorted_maquinas:
     print(f'      {maquina:40} ({mes}): ${g["total"]:,.0f}')
@@ -70,44 +149,23 @@ for (maquina, mes), g in sorted_maquinas:
 # 3. Verificar que el total por categoría coincida
 print('\n3. VERIFICACIÓN DE TOTALES POR CATEGORÍA')
 
-# Calcular total por categoría directamente desde los gastos
-categorias_directo = defaultdict(lambda: Decimal('0'))
-for g in gastos:
-    if not g.es_ingreso and g.tipo_gasto.startswith('401'):
-        categorias_directo[g.tipo_gasto] += g.monto
+# El total por categoría directo desde los gastos (categorias_directo) se
+# acumuló en la pasada de duplicados del paso 1
 
-# Calcular total por categoría desde el calculador
-categorias_calculador = defaultdict(Decimal)
-for (maquina, mes), g in gastos_calculados.items():
-    for cat in ['combustibles', 'reparaciones', 'seguros', 'honorarios', 
-                'epp', 'peajes', 'remuneraciones', 'permisos', 'alimentacion',
-                'pasajes', 'correspondencia', 'gastos_legales', 'multas', 'otros_gastos']:
-        categorias_calculador[cat] += g[cat]
+# Calcular total por categoría desde el calculador: una suma por categoría
+# sobre todos los grupos (máquina, mes), en vez de recorrer las 14 en cada grupo
+grupos_calculados = gastos_calculados.values()
+categorias_calculador = {
+    cat: sum((g[cat] for g in grupos_calculados), Decimal('0'))
+    for cat in mapeo
+}
 
 print('   Comparación totales por categoría (DIRECTO vs CALCULADOR):')
 print('   ' + '-' * 80)
 
-# Mapeo de categorias a códigos de cuenta
-mapeo = {
-    'combustibles': '401010101',
-    'reparaciones': '401010102',
-    'seguros': '401010115',
-    'honorarios': '401010109',
-    'epp': '401010104',
-    'peajes': '401010105',
-    'remuneraciones': '401010108',
-    'permisos': '401010116',
-    'alimentacion': '401010112',
-    'pasajes': '401010111',
-    'correspondencia': '401020107',
-    'gastos_legales': '401020108',
-    'multas': '401030102',
-    'otros_gastos': '401030107'
-}
-
 diferencias = []
-for cat, codigo in mapeo.items():
-    total_directo = categorias_directo.get(codigo, Decimal('0'))
+for cat in mapeo:
+    total_directo = categorias_directo.get(cat, Decimal('0'))
     total_calculador = categorias_calculador[cat]
     diferencia = total_directo - total_calculador
     
@@ -123,11 +181,7 @@ else:
 # 4. Verificación de integridad total
 print('\n4. VERIFICACIÓN DE INTEGRIDAD TOTAL')
 
-# Total directo desde gastos
-total_directo_gastos = sum(g.monto for g in gastos if not g.es_ingreso and g.tipo_gasto.startswith('401'))
-
-# Total directo desde repuestos
-total_directo_repuestos = sum(rep.total for rep in repuestos)
+# Los totales directos de gastos (401xxx) y repuestos vienen del paso 1
 
 # Total desde calculador
 total_calculador = sum(g['total'] for g in gastos_calculados.values())